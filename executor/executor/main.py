@@ -1,15 +1,68 @@
 import json
+import os
 import platform
+import queue
+import re
 import subprocess
+import sys
+import threading
 import time
+from functools import lru_cache
 from pathlib import Path
-from typing import Literal
+from typing import Literal, get_args
 from uuid import uuid4
 
 import yaml
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Request, Response
+from fastapi.concurrency import run_in_threadpool
+from fastapi.exceptions import RequestValidationError
 from fastapi.middleware.cors import CORSMiddleware
-from pydantic import BaseModel
+from pydantic import BaseModel, ValidationError
+
+try:
+    import orjson
+
+    # orjson.Fragment (orjson >= 3.9) embeds already-serialized JSON verbatim.
+    _RawJSON = getattr(orjson, "Fragment", None)
+
+    def _jsonl_line(record: dict) -> bytes:
+        return orjson.dumps(record, option=orjson.OPT_APPEND_NEWLINE)
+except ImportError:
+    _RawJSON = None
+
+    def _jsonl_line(record: dict) -> bytes:
+        return (json.dumps(record, ensure_ascii=True) + "\n").encode("ascii")
+
+# A top-level `"features": {...}` value that is a flat object of JSON scalars,
+# which is what gesture.js extractFeatures sends. Strings may not contain escape
+# sequences and numbers must be plain JSON numbers, so NaN/Infinity (accepted by
+# the request parser, written as null by the encoder) never reach the log raw.
+# Line breaks are excluded so a pretty-printed body cannot split a JSONL record.
+_JSON_WS     = rb'[ \t]*'
+_JSON_STR    = rb'"[^"\\\r\n]*"'
+# Bounded integer and exponent digits keep every number a finite double.
+_JSON_NUMBER = rb'-?(?:0|[1-9]\d{0,15})(?:\.\d+)?(?:[eE][-+]?\d{1,2})?'
+_JSON_SCALAR = rb'(?:' + _JSON_STR + rb'|' + _JSON_NUMBER + rb'|true|false|null)'
+_JSON_MEMBER = _JSON_STR + _JSON_WS + rb':' + _JSON_WS + _JSON_SCALAR + _JSON_WS
+_FLAT_FEATURES_RE = re.compile(
+    rb'"features"' + _JSON_WS + rb':' + _JSON_WS
+    + rb'(\{' + _JSON_WS + rb'(?:' + _JSON_MEMBER + rb'(?:,' + _JSON_WS + _JSON_MEMBER + rb')*)?\})'
+)
+
+
+def _raw_features(body: bytes) -> bytes | None:
+    """Slice the features object out of a request body exactly as the client sent it.
+
+    Returns None when the slice would be ambiguous or not what the parser saw:
+    the key appears more than once (e.g. inside student_prediction), the body has
+    any backslash escape (an escaped key such as "fe\\u0061tures" is a duplicate
+    the byte count cannot see), or the value is not a flat object of scalars.
+    """
+    if b"\\" in body or body.count(b'"features"') != 1:
+        return None
+    m = _FLAT_FEATURES_RE.search(body)
+    return m.group(1) if m else None
+
 
 Intent = Literal["OPEN_MENU", "CLOSE_MENU", "SWITCH_RIGHT", "SWITCH_LEFT"]
 
@@ -17,6 +70,22 @@ REPO_ROOT = Path(__file__).resolve().parents[2]
 ACTIONS_PATH = REPO_ROOT / "executor" / "actions.yaml"
 EXECUTOR_LOG_PATH = REPO_ROOT / "executor" / "logs" / "executor_events.jsonl"
 
+# Set EXECUTOR_KEY_BACKEND=uinput on Linux to inject keys through a virtual
+# /dev/uinput keyboard (needs python-uinput and write access to /dev/uinput)
+# instead of running xdotool.
+EXECUTOR_KEY_BACKEND = os.environ.get("EXECUTOR_KEY_BACKEND", "xdotool")
+
+# Upper bound on one xdotool/osascript run before /execute gives up on it.
+KEY_COMMAND_TIMEOUT_S = 5.0
+
+# libyaml's C loader is much faster than the pure-Python one; fall back when the
+# PyYAML wheel was built without it.
+_YamlLoader = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+
+# (st_mtime, st_size, parsed actions) — re-parsed only when actions.yaml changes.
+_ACTIONS_CACHE: tuple[float, int, dict] | None = None
+_ACTIONS_LOCK = threading.Lock()
+
 app = FastAPI(title="Cosmos Gesture Executor", version="0.1.0")
 app.add_middleware(
     CORSMiddleware,
@@ -55,13 +124,27 @@ def _detect_os_key() -> str:
 
 
 def _load_actions() -> dict:
-    if not ACTIONS_PATH.exists():
-        raise RuntimeError(f"Missing actions config: {ACTIONS_PATH}")
-    with ACTIONS_PATH.open("r", encoding="utf-8") as f:
-        data = yaml.safe_load(f)
-    if not isinstance(data, dict):
-        raise RuntimeError("actions.yaml must contain a top-level object")
-    return data
+    """Return the parsed actions.yaml, cached until its mtime or size changes.
+
+    The returned dict is shared between requests and must not be mutated.
+    """
+    global _ACTIONS_CACHE
+    try:
+        st = os.stat(ACTIONS_PATH)
+    except FileNotFoundError:
+        raise RuntimeError(f"Missing actions config: {ACTIONS_PATH}") from None
+
+    with _ACTIONS_LOCK:
+        cached = _ACTIONS_CACHE
+        if cached is not None and cached[0] == st.st_mtime and cached[1] == st.st_size:
+            return cached[2]
+
+        with ACTIONS_PATH.open("r", encoding="utf-8") as f:
+            data = yaml.load(f, Loader=_YamlLoader)
+        if not isinstance(data, dict):
+            raise RuntimeError("actions.yaml must contain a top-level object")
+        _ACTIONS_CACHE = (st.st_mtime, st.st_size, data)
+        return data
 
 
 def _key_combo_for_intent(intent: Intent, os_key: str) -> str:
@@ -75,6 +158,30 @@ def _key_combo_for_intent(intent: Intent, os_key: str) -> str:
     return key_combo
 
 
+_MACOS_MODIFIERS = {
+    "ctrl": "control down",
+    "control": "control down",
+    "cmd": "command down",
+    "command": "command down",
+    "shift": "shift down",
+    "alt": "option down",
+    "option": "option down",
+}
+
+_MACOS_SPECIAL_KEY_CODES = {
+    "right": 124,
+    "left": 123,
+    "up": 126,
+    "down": 125,
+    "escape": 53,
+    "esc": 53,
+    "space": 49,
+    "return": 36,
+    "enter": 36,
+}
+
+
+@lru_cache(maxsize=32)
 def _macos_osascript_for_combo(combo: str) -> str:
     parts = [p.strip() for p in combo.split("+") if p.strip()]
     if not parts:
@@ -83,42 +190,20 @@ def _macos_osascript_for_combo(combo: str) -> str:
     key_token = parts[-1].lower()
     modifier_tokens = [p.lower() for p in parts[:-1]]
 
-    modifiers_map = {
-        "ctrl": "control down",
-        "control": "control down",
-        "cmd": "command down",
-        "command": "command down",
-        "shift": "shift down",
-        "alt": "option down",
-        "option": "option down",
-    }
-
     modifiers = []
     for token in modifier_tokens:
-        if token not in modifiers_map:
+        if token not in _MACOS_MODIFIERS:
             raise RuntimeError(f"Unsupported macOS modifier in combo '{combo}': {token}")
-        modifiers.append(modifiers_map[token])
-
-    special_key_codes = {
-        "right": 124,
-        "left": 123,
-        "up": 126,
-        "down": 125,
-        "escape": 53,
-        "esc": 53,
-        "space": 49,
-        "return": 36,
-        "enter": 36,
-    }
+        modifiers.append(_MACOS_MODIFIERS[token])
 
     using_clause = ""
     if modifiers:
         using_clause = " using {" + ", ".join(modifiers) + "}"
 
-    if key_token in special_key_codes:
+    if key_token in _MACOS_SPECIAL_KEY_CODES:
         return (
             'tell application "System Events"\n'
-            f"  key code {special_key_codes[key_token]}{using_clause}\n"
+            f"  key code {_MACOS_SPECIAL_KEY_CODES[key_token]}{using_clause}\n"
             "end tell"
         )
 
@@ -133,25 +218,211 @@ def _macos_osascript_for_combo(combo: str) -> str:
     raise RuntimeError(f"Unsupported macOS key token in combo '{combo}': {key_token}")
 
 
-def _execute_linux(key_combo: str) -> None:
-    subprocess.run(["xdotool", "key", key_combo], check=True)
+def _argv_for_combo(key_combo: str, os_key: str) -> list[str]:
+    if os_key == "linux":
+        return ["xdotool", "key", key_combo]
+    if os_key == "macos":
+        return ["osascript", "-e", _macos_osascript_for_combo(key_combo)]
+    raise RuntimeError(f"Unsupported operating system key: {os_key}")
+
+
+class SubprocessKeySender:
+    """Send key chords by running the precomputed xdotool/osascript argv per intent."""
+
+    def __init__(self, argv_by_intent: dict[str, list[str]]) -> None:
+        self._argv_by_intent = argv_by_intent
+
+    def send(self, intent: Intent) -> None:
+        # The timeout bounds a hung tool (e.g. osascript waiting on the macOS
+        # Accessibility prompt) to the request that started it.
+        subprocess.run(self._argv_by_intent[intent], check=True, timeout=KEY_COMMAND_TIMEOUT_S)
+
+    def close(self) -> None:
+        pass
+
+
+# xdotool keysym (lowercased) → python-uinput key name, for the tokens actions.yaml uses.
+_UINPUT_KEY_NAMES = {
+    "ctrl": "KEY_LEFTCTRL",
+    "control": "KEY_LEFTCTRL",
+    "shift": "KEY_LEFTSHIFT",
+    "alt": "KEY_LEFTALT",
+    "super": "KEY_LEFTMETA",
+    "super_l": "KEY_LEFTMETA",
+    "meta": "KEY_LEFTMETA",
+    "escape": "KEY_ESC",
+    "esc": "KEY_ESC",
+    "return": "KEY_ENTER",
+    "enter": "KEY_ENTER",
+    "tab": "KEY_TAB",
+    "space": "KEY_SPACE",
+    "right": "KEY_RIGHT",
+    "left": "KEY_LEFT",
+    "up": "KEY_UP",
+    "down": "KEY_DOWN",
+}
+
+
+def _uinput_key_names(combo: str) -> list[str]:
+    names = []
+    for token in (p.strip().lower() for p in combo.split("+")):
+        if token in _UINPUT_KEY_NAMES:
+            names.append(_UINPUT_KEY_NAMES[token])
+        elif len(token) == 1 and token.isalnum():
+            names.append(f"KEY_{token.upper()}")
+        else:
+            raise RuntimeError(f"Unsupported uinput key token in combo '{combo}': {token}")
+    return names
+
+
+class UinputKeyboard:
+    """Virtual keyboard that injects key chords through /dev/uinput.
+
+    Chords are resolved to key codes once; a keystroke is then a handful of
+    in-process event writes with no subprocess and no X server round trip.
+    """
+
+    def __init__(self, intent_to_combo: dict[str, str]) -> None:
+        import uinput
+
+        self._keys_by_intent = {
+            intent: [getattr(uinput, name) for name in _uinput_key_names(combo)]
+            for intent, combo in intent_to_combo.items()
+        }
+        all_keys = {key for keys in self._keys_by_intent.values() for key in keys}
+        self._device = uinput.Device(sorted(all_keys), name="cosmos-gesture-executor")
+        self._lock = threading.Lock()
+
+    def send(self, intent: Intent) -> None:
+        keys = self._keys_by_intent[intent]
+        with self._lock:
+            for key in keys:
+                self._device.emit(key, 1, syn=False)
+            self._device.syn()
+            for key in reversed(keys):
+                self._device.emit(key, 0, syn=False)
+            self._device.syn()
+
+    def close(self) -> None:
+        self._device.destroy()
+
+
+class JsonlWriter:
+    """Append JSONL records to a file from a background thread.
+
+    Handlers enqueue records and return immediately. The writer thread serializes
+    records into one buffer and flushes it with a single os.write() once 64 KiB
+    have accumulated or 50 ms after the first buffered record, whichever comes
+    first. The file is opened once with O_APPEND, so each flush is one atomic
+    append and no open()/close() happens after startup.
+    """
+
+    FLUSH_BYTES = 64 * 1024
+    FLUSH_INTERVAL_S = 0.05
+    CLOSE_TIMEOUT_S = 5.0
+
+    _STOP = object()
+
+    def __init__(self, path: Path, maxsize: int = 10_000) -> None:
+        self._fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_APPEND, 0o644)
+        self._queue: queue.Queue = queue.Queue(maxsize=maxsize)
+        self._thread = threading.Thread(target=self._run, name="jsonl-writer", daemon=True)
+        self._thread.start()
+
+    def put(self, record: dict) -> None:
+        try:
+            self._queue.put_nowait(record)
+        except queue.Full:
+            print(f"[executor] log queue full, dropping event {record.get('event_id')}",
+                  file=sys.stderr, flush=True)
+
+    def close(self) -> None:
+        try:
+            self._queue.put(self._STOP, timeout=self.CLOSE_TIMEOUT_S)
+        except queue.Full:
+            print("[executor] log queue still full at shutdown; unwritten events are lost",
+                  file=sys.stderr, flush=True)
+        self._thread.join(timeout=self.CLOSE_TIMEOUT_S)
+        if not self._thread.is_alive():
+            os.close(self._fd)
+
+    def _run(self) -> None:
+        buf = bytearray()
+        deadline = 0.0
+        while True:
+            timeout = max(0.0, deadline - time.monotonic()) if buf else None
+            try:
+                item = self._queue.get(timeout=timeout)
+            except queue.Empty:
+                item = None
+            if item is self._STOP:
+                break
+            if item is not None:
+                if not buf:
+                    deadline = time.monotonic() + self.FLUSH_INTERVAL_S
+                buf += self._encode(item)
+                if len(buf) < self.FLUSH_BYTES and time.monotonic() < deadline:
+                    continue
+            self._write(self._fd, buf)
+            buf.clear()
+        self._write(self._fd, buf)
+
+    @staticmethod
+    def _encode(record: dict) -> bytes:
+        # One record that cannot be encoded must not stop the writer thread.
+        try:
+            return _jsonl_line(record)
+        except Exception:
+            pass  # e.g. orjson rejects integers beyond 64 bits; the stdlib encoder does not
+        try:
+            return (json.dumps(record, ensure_ascii=True) + "\n").encode("ascii")
+        except Exception as exc:
+            print(f"[executor] cannot encode event {record.get('event_id')}, dropping it: {exc}",
+                  file=sys.stderr, flush=True)
+            return b""
+
+    @staticmethod
+    def _write(fd: int, buf: bytearray) -> None:
+        view = memoryview(buf)
+        try:
+            while view:
+                view = view[os.write(fd, view):]
+        except OSError as exc:
+            print(f"[executor] failed to write event log: {exc}", file=sys.stderr, flush=True)
 
 
-def _execute_macos(key_combo: str) -> None:
-    script = _macos_osascript_for_combo(key_combo)
-    subprocess.run(["osascript", "-e", script], check=True)
+@app.on_event("startup")
+def _ensure_executor_log_dir() -> None:
+    EXECUTOR_LOG_PATH.parent.mkdir(parents=True, exist_ok=True)
+    app.state.event_log = JsonlWriter(EXECUTOR_LOG_PATH)
 
 
-def append_jsonl(path: Path, record: dict) -> None:
-    path.parent.mkdir(parents=True, exist_ok=True)
-    with path.open("a", encoding="utf-8") as f:
-        f.write(json.dumps(record, ensure_ascii=True) + "\n")
-        f.flush()
+@app.on_event("shutdown")
+def _close_event_log() -> None:
+    app.state.event_log.close()
 
 
 @app.on_event("startup")
-def _ensure_executor_log_dir() -> None:
-    EXECUTOR_LOG_PATH.parent.mkdir(parents=True, exist_ok=True)
+def _resolve_key_combos() -> None:
+    # The OS and the intent mapping are fixed for the process lifetime, so resolve
+    # them once here and fail fast on a broken actions.yaml instead of per request.
+    os_key = _detect_os_key()
+    app.state.os_key = os_key
+    app.state.intent_to_combo = {
+        intent: _key_combo_for_intent(intent, os_key) for intent in get_args(Intent)
+    }
+    if os_key == "linux" and EXECUTOR_KEY_BACKEND == "uinput":
+        app.state.key_sender = UinputKeyboard(app.state.intent_to_combo)
+    else:
+        app.state.key_sender = SubprocessKeySender({
+            intent: _argv_for_combo(combo, os_key)
+            for intent, combo in app.state.intent_to_combo.items()
+        })
+
+
+@app.on_event("shutdown")
+def _stop_key_sender() -> None:
+    app.state.key_sender.close()
 
 
 @app.get("/health")
@@ -159,32 +430,56 @@ def health() -> dict:
     return {"status": "ok"}
 
 
-@app.post("/execute", response_model=ExecuteResponse)
-def execute(req: ExecuteRequest) -> ExecuteResponse:
+@app.post(
+    "/execute",
+    response_model=ExecuteResponse,
+    openapi_extra={
+        "requestBody": {
+            "required": True,
+            "content": {"application/json": {"schema": ExecuteRequest.model_json_schema()}},
+        },
+    },
+)
+async def execute(request: Request) -> Response:
+    # Validate straight from the raw body: pydantic-core parses and checks the JSON
+    # in one pass instead of FastAPI's json.loads() dict followed by validation.
+    body = await request.body()
+    try:
+        req = ExecuteRequest.model_validate_json(body)
+    except ValidationError as exc:
+        raise RequestValidationError(
+            [{**err, "loc": ("body", *err["loc"])} for err in exc.errors(include_url=False)]
+        ) from exc
+
+    # The body already holds the features as JSON; log those bytes instead of
+    # having the writer thread re-encode the parsed dict float by float.
+    raw_features = _raw_features(body) if req.features and _RawJSON is not None else None
+
+    resp = await run_in_threadpool(_execute, req, raw_features)
+    # The response model was validated on construction; returning a Response
+    # skips FastAPI's response_model re-validation and re-encoding.
+    return Response(content=resp.model_dump_json(), media_type="application/json")
+
+
+def _execute(req: ExecuteRequest, raw_features: bytes | None = None) -> ExecuteResponse:
     started = time.perf_counter()
     ts_unix = time.time()
     event_id = req.event_id or str(uuid4())
 
     try:
-        os_key = _detect_os_key()
-        key_combo = _key_combo_for_intent(req.intent, os_key)
+        os_key = app.state.os_key
+        key_combo = app.state.intent_to_combo[req.intent]
 
         executed = False
         detail = "dry run: no key event sent"
 
         if not req.dry_run:
-            if os_key == "linux":
-                _execute_linux(key_combo)
-            elif os_key == "macos":
-                _execute_macos(key_combo)
-            else:
-                raise RuntimeError(f"Unsupported operating system key: {os_key}")
+            app.state.key_sender.send(req.intent)
             executed = True
             detail = "key event dispatched"
 
         latency_ms = round((time.perf_counter() - started) * 1000, 3)
-        append_jsonl(
-            EXECUTOR_LOG_PATH,
+        app.state.event_log.put(
             {
                 "event_id": event_id,
                 "ts_unix": ts_unix,
@@ -195,7 +490,8 @@ def execute(req: ExecuteRequest) -> ExecuteResponse:
                 "source": req.source,
                 "os_name": os_key,
                 "latency_ms": latency_ms,
-                **({"features": req.features} if req.features else {}),
+                **({"features": _RawJSON(raw_features) if raw_features else req.features}
+                   if req.features else {}),
                 **({"student_prediction": req.student_prediction} if req.student_prediction else {}),
             }
         )
@@ -209,11 +505,29 @@ def execute(req: ExecuteRequest) -> ExecuteResponse:
             detail=detail,
         )
 
+    except subprocess.TimeoutExpired as exc:
+        latency_ms = round((time.perf_counter() - started) * 1000, 3)
+        error_msg = f"Key command {exc.cmd[0]} timed out after {exc.timeout:g}s"
+        app.state.event_log.put(
+            {
+                "event_id": event_id,
+                "ts_unix": ts_unix,
+                "intent": req.intent,
+                "key_combo": "",
+                "executed": False,
+                "dry_run": req.dry_run,
+                "source": req.source,
+                "os_name": platform.system().lower(),
+                "latency_ms": latency_ms,
+                "error": error_msg,
+            }
+        )
+        raise HTTPException(status_code=504, detail=error_msg) from exc
+
     except subprocess.CalledProcessError as exc:
         latency_ms = round((time.perf_counter() - started) * 1000, 3)
         error_msg = f"Command failed: {exc}"
-        append_jsonl(
-            EXECUTOR_LOG_PATH,
+        app.state.event_log.put(
             {
                 "event_id": event_id,
                 "ts_unix": ts_unix,
@@ -232,8 +546,7 @@ def execute(req: ExecuteRequest) -> ExecuteResponse:
     except Exception as exc:
         latency_ms = round((time.perf_counter() - started) * 1000, 3)
         error_msg = str(exc)
-        append_jsonl(
-            EXECUTOR_LOG_PATH,
+        app.state.event_log.put(
             {
                 "event_id": event_id,
                 "ts_unix": ts_unix,
@@ -0,0 +1,5 @@
+import sys
+from pathlib import Path
+
+# Import the service as `executor.main` without installing the package.
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
@@ -0,0 +1,24 @@
+import json
+import subprocess
+
+from fastapi.testclient import TestClient
+
+import executor.main as main
+
+
+def test_hung_key_command_is_a_504_with_a_clear_error(tmp_path, monkeypatch):
+    def run(argv, check, timeout):
+        raise subprocess.TimeoutExpired(argv, timeout)
+
+    path = tmp_path / "executor_events.jsonl"
+    monkeypatch.setattr(main, "EXECUTOR_LOG_PATH", path)
+    monkeypatch.setattr(main, "EXECUTOR_KEY_BACKEND", "xdotool")
+    monkeypatch.setattr(main.subprocess, "run", run)
+    with TestClient(main.app) as client:
+        resp = client.post("/execute", json={"intent": "OPEN_MENU", "event_id": "e1"})
+
+    message = f"timed out after {main.KEY_COMMAND_TIMEOUT_S:g}s"
+    assert resp.status_code == 504
+    assert message in resp.json()["detail"]
+    event = json.loads(path.read_bytes())
+    assert event["event_id"] == "e1" and not event["executed"] and message in event["error"]
@@ -0,0 +1,52 @@
+import json
+import time
+
+from executor.main import JsonlWriter
+
+
+def read_records(path):
+    return [json.loads(line) for line in path.read_text().splitlines()]
+
+
+def test_close_flushes_buffered_records(tmp_path):
+    path   = tmp_path / "events.jsonl"
+    writer = JsonlWriter(path)
+    for i in range(3):
+        writer.put({"event_id": str(i)})
+    writer.close()
+    assert [r["event_id"] for r in read_records(path)] == ["0", "1", "2"]
+
+
+def test_records_are_flushed_without_close(tmp_path):
+    path   = tmp_path / "events.jsonl"
+    writer = JsonlWriter(path)
+    writer.put({"event_id": "a"})
+    deadline = time.monotonic() + 2
+    while not path.read_bytes() and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert read_records(path) == [{"event_id": "a"}]
+    writer.close()
+
+
+def test_unencodable_record_does_not_stop_the_writer(tmp_path, capsys):
+    path   = tmp_path / "events.jsonl"
+    writer = JsonlWriter(path)
+    writer.put({"event_id": "big", "student_prediction": {"x": 10**23}})
+    writer.put({"event_id": "bad", "value": object()})
+    writer.put({"event_id": "after"})
+    writer.close()
+    records = read_records(path)
+    assert [r["event_id"] for r in records] == ["big", "after"]
+    assert records[0]["student_prediction"]["x"] == 10**23
+    assert "dropping it" in capsys.readouterr().err
+
+
+def test_close_does_not_block_on_a_full_queue(tmp_path):
+    writer = JsonlWriter(tmp_path / "events.jsonl", maxsize=1)
+    writer.CLOSE_TIMEOUT_S = 0.1
+    writer._queue.put(writer._STOP)   # stop the thread, then fill the queue behind it
+    writer._thread.join()
+    writer.put({"event_id": "late"})
+    started = time.monotonic()
+    writer.close()
+    assert time.monotonic() - started < 2
@@ -0,0 +1,60 @@
+import json
+
+import pytest
+
+from executor.main import _raw_features
+
+
+def body(features_json, **extra):
+    fields = ['"intent":"OPEN_MENU"', f'"features":{features_json}']
+    fields += [f'"{k}":{json.dumps(v)}' for k, v in extra.items()]
+    return ("{" + ",".join(fields) + "}").encode()
+
+
+@pytest.mark.parametrize("features", [
+    '{"wristX":0.5,"handSide":"right","palmFacing":-1e-3,"ok":true,"none":null}',
+    '{ "a" : 1 , "b" : 2.25E+10 }',
+    '{}',
+])
+def test_flat_features_are_sliced_verbatim(features):
+    assert _raw_features(body(features)) == features.encode()
+
+
+@pytest.mark.parametrize("features", [
+    '{"a":NaN}',
+    '{"a":Infinity}',
+    '{"a":-Infinity}',
+    '{"a":1e999}',
+    '{"a":' + "9" * 400 + '}',
+    '{"a":{"b":1}}',
+    '{"a":[1,2]}',
+    '{"a":"x\\"y"}',
+    '{"a":\n1}',
+])
+def test_non_json_or_nested_values_use_the_dict_path(features):
+    assert _raw_features(body(features)) is None
+
+
+def test_escaped_duplicate_key_uses_the_dict_path():
+    raw = b'{"intent":"OPEN_MENU","features":{"a":1},"fe\\u0061tures":{"a":2}}'
+    assert _raw_features(raw) is None
+
+
+def test_features_key_inside_another_field_uses_the_dict_path():
+    assert _raw_features(body('{"a":1}', student_prediction={"features": {"a": 2}})) is None
+
+
+def test_logged_features_match_the_validated_request(tmp_path, monkeypatch):
+    from fastapi.testclient import TestClient
+
+    import executor.main as main
+
+    path = tmp_path / "executor_events.jsonl"
+    monkeypatch.setattr(main, "EXECUTOR_LOG_PATH", path)
+    with TestClient(main.app) as client:
+        for raw in [body('{"a":1.50,"b":"x"}'), b'{"intent":"OPEN_MENU","features":{"a":NaN}}']:
+            resp = client.post("/execute", content=raw.replace(b'"OPEN_MENU"', b'"OPEN_MENU","dry_run":true'))
+            assert resp.status_code == 200
+    lines = path.read_bytes().splitlines()
+    assert b'"features":{"a":1.50,"b":"x"}' in lines[0]
+    assert json.loads(lines[1])["features"] == {"a": None}
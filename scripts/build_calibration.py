@@ -2,7 +2,8 @@
 """Build calibration set from eval results and live verifier logs.
 
 Sources:
-  1. data/eval/results/eval_results.json  — labelled eval clips (existing path)
+  1. data/eval/results/eval_results.jsonl — labelled eval clips from eval_cosmos.py
+     (falls back to the older single-document eval_results.json)
   2. verifier/logs/verifier_events.jsonl  — live gesture events with Cosmos verdicts
 
 Both sources produce records in the format expected by scripts/train_student.py:
@@ -17,16 +18,42 @@ Usage:
     python scripts/build_calibration.py
 """
 
-import json
+import mmap
+import os
+import re
 import sys
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 
+from clips_cache import load_clip_files
+from jsonio import HAVE_ORJSON, dumps, iter_lines, loads, read_json
+
 REPO_ROOT         = Path(__file__).resolve().parents[1]
-RESULTS_PATH      = REPO_ROOT / "data" / "eval" / "results" / "eval_results.json"
-CLIPS_DIR         = REPO_ROOT / "data" / "eval" / "clips"
+RESULTS_PATH      = REPO_ROOT / "data" / "eval" / "results" / "eval_results.jsonl"
+LEGACY_RESULTS_PATH = REPO_ROOT / "data" / "eval" / "results" / "eval_results.json"
 CALIB_PATH        = REPO_ROOT / "data" / "calibration" / "calibration.jsonl"
 VERIFIER_LOG_PATH = REPO_ROOT / "verifier" / "logs" / "verifier_events.jsonl"
 
+PARALLEL_PARSE_MIN_BYTES = 32 * 1024 * 1024   # smaller verifier logs are parsed in-process
+
+# orjson parses a log line in less time than _STUB_HEAD_RE takes to match one,
+# so stub records are only recognised without parsing under the stdlib parser.
+PRESCREEN_STUBS = not HAVE_ORJSON
+
+# Head of a verifier log record whose verdict came from the stub. The verifier
+# writes event_id, ts_request_received_unix, proposed_intent and nim_called
+# first, in that order. Only plain JSON is accepted: no escapes or control
+# characters in the strings and a number both parsers read the same way.
+_JSON_WS       = rb'[ \t\r\n]*'
+_STUB_HEAD_RE  = re.compile(
+    rb'\{' + _JSON_WS + rb'"event_id"' + _JSON_WS + rb':' + _JSON_WS + rb'"([^"\\\x00-\x1f]*)"'
+    + _JSON_WS + rb',' + _JSON_WS + rb'"ts_request_received_unix"' + _JSON_WS + rb':' + _JSON_WS
+    + rb'-?(?:0|[1-9]\d{0,15})(?:\.\d+)?(?:[eE][-+]?\d{1,2})?'
+    + _JSON_WS + rb',' + _JSON_WS + rb'"proposed_intent"' + _JSON_WS + rb':' + _JSON_WS + rb'"[^"\\\x00-\x1f]*"'
+    + _JSON_WS + rb',' + _JSON_WS + rb'"nim_called"' + _JSON_WS + rb':' + _JSON_WS + rb'false'
+    + _JSON_WS + rb','
+)
+
 TP_LABELS = frozenset(["TP_OPEN_MENU", "TP_CLOSE_MENU", "TP_SWITCH_RIGHT", "TP_SWITCH_LEFT"])
 
 LABEL_TO_INTENT = {
@@ -47,31 +74,51 @@ REQUIRED_NUMERIC = frozenset([
 
 # ─── Source 1: eval data ──────────────────────────────────────────────────────
 
-def load_clips_by_key():
+def load_results():
+    """Return eval result records, or None when eval_cosmos.py has not been run.
+
+    Reads the streamed eval_results.jsonl; a torn final line from an interrupted
+    run is skipped. Falls back to the legacy eval_results.json document.
+    """
+    if RESULTS_PATH.exists():
+        results = []
+        with RESULTS_PATH.open("rb") as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    results.append(loads(line))
+                except ValueError:
+                    continue
+        return results
+
+    if LEGACY_RESULTS_PATH.exists():
+        return read_json(LEGACY_RESULTS_PATH).get("results", [])
+
+    return None
+
+
+def load_clips_by_key(needed_keys=None):
     """Build (clip_id, label) → clip map from all clip files and session files.
 
     Keying by (clip_id, label) rather than clip_id alone handles the case where
     two eval sessions reuse the same clip numbering for different recordings.
+    When needed_keys is given, only those clips are kept.
     """
     clips = {}
 
-    for p in sorted(CLIPS_DIR.glob("clip_*.json")):
-        with p.open() as f:
-            data = json.load(f)
+    def keep(clip):
+        key = (clip["clip_id"], clip.get("label", ""))
+        if needed_keys is None or key in needed_keys:
+            clips[key] = clip
+
+    for p, data in load_clip_files():
         if isinstance(data, list):
             for clip in data:
-                clips[(clip["clip_id"], clip.get("label", ""))] = clip
-        else:
-            clips[(data["clip_id"], data.get("label", ""))] = data
-
-    sessions_dir = CLIPS_DIR.parent / "sessions"
-    if sessions_dir.exists():
-        for p in sorted(sessions_dir.glob("eval_session_*.json")):
-            with p.open() as f:
-                data = json.load(f)
-            if isinstance(data, list):
-                for clip in data:
-                    clips[(clip["clip_id"], clip.get("label", ""))] = clip
+                keep(clip)
+        elif p.name.startswith("clip_"):
+            keep(data)
 
     return clips
 
@@ -82,20 +129,22 @@ def load_eval_events(results, clips_by_key):
     Returns (accepted_list, counters_dict).
     """
     accepted          = []
-    seen_keys         = set()
     skipped_error     = 0
     skipped_disagree  = 0
     skipped_no_feat   = 0
-    skipped_duplicate = 0
 
+    # One record per key: the first successful one, else the first error. A
+    # resumed eval run appends retries of errored clips after the error record.
+    chosen = {}
     for r in results:
-        clip_id    = r.get("clip_id")
-        user_label = r.get("user_label", "")
-        key        = (clip_id, user_label)
-        if key in seen_keys:
-            skipped_duplicate += 1
-            continue
-        seen_keys.add(key)
+        key  = (r.get("clip_id"), r.get("user_label", ""))
+        kept = chosen.get(key)
+        if kept is None or (kept.get("cosmos_error") and not r.get("cosmos_error")):
+            chosen[key] = r
+    skipped_duplicate = len(results) - len(chosen)
+
+    for key, r in chosen.items():
+        clip_id, user_label = key
 
         if r.get("cosmos_error"):
             skipped_error += 1
@@ -105,6 +154,7 @@ def load_eval_events(results, clips_by_key):
         cosmos_intent = r.get("cosmos_final_intent")
         is_tp         = user_label in TP_LABELS
         is_neg        = user_label.startswith("NEG_")
+        clip          = clips_by_key.get(key)
 
         if is_tp:
             expected_intent = LABEL_TO_INTENT[user_label]
@@ -119,14 +169,12 @@ def load_eval_events(results, clips_by_key):
                 skipped_disagree += 1
                 continue
             label_int    = 0
-            clip         = clips_by_key.get((clip_id, user_label), {})
-            gesture_type = clip.get("gesture_detected") or "SWITCH_RIGHT"
+            gesture_type = (clip.get("gesture_detected") if clip else None) or "SWITCH_RIGHT"
 
         else:
             skipped_disagree += 1
             continue
 
-        clip = clips_by_key.get((clip_id, user_label))
         if not clip or not clip.get("features"):
             skipped_no_feat += 1
             continue
@@ -150,104 +198,184 @@ def load_eval_events(results, clips_by_key):
 
 # ─── Source 2: live verifier logs ────────────────────────────────────────────
 
-def load_live_events(log_path):
-    """Read verifier_events.jsonl and extract calibration records.
+def _classify_event(event):
+    """Apply the live-path inclusion criteria to one parsed log event.
 
-    Inclusion criteria:
-      - nim_called=True        — real Cosmos NIM verdict, not stub
-      - response_json present and schema_valid=True
-      - features dict contains all 12 required numeric fields
+    Returns the calibration record, or the name of the counter the event is
+    skipped under.
+    """
+    # Only real NIM calls carry ground-truth Cosmos verdicts.
+    # Stub responses are predictable mocks, not valid training signal.
+    if not event.get("nim_called"):
+        return "skipped_not_nim"
+
+    response = event.get("response_json")
+    if not response or not event.get("schema_valid"):
+        return "skipped_no_resp"
+
+    intentional = response.get("intentional")
+    if intentional is None:
+        return "skipped_no_resp"
+
+    features = event.get("features")
+    if not features or not REQUIRED_NUMERIC.issubset(features.keys()):
+        return "skipped_no_feat"
+
+    proposed     = event.get("proposed_intent")
+    gesture_type = features.get("gestureType") or proposed or "SWITCH_RIGHT"
+
+    return {
+        "event_id":      event.get("event_id"),
+        "features":      features,
+        "gesture_type":  gesture_type,
+        "label":         1 if intentional else 0,
+        "cosmos_intent": response.get("final_intent"),
+    }
 
-    Deduplication is by event_id (UUID generated per verify request).
 
-    Returns (accepted_list, counters_dict).
+def _stub_event_id(line):
+    """The event_id of a complete stub record, read without parsing the line.
+
+    Returns None whenever the line might not be exactly one valid record, and
+    the caller then parses it. The writer appends whole lines, so the only
+    malformed lines come from a write torn by a crash: at the end of the file
+    it has no newline (the caller never asks about that line), and anywhere
+    else the next record is glued onto it, bringing a second "event_id" key.
+    NaN and Infinity, which the stdlib encoder writes and orjson rejects, are
+    left to the parser as well.
     """
-    if not log_path.exists():
-        return [], {
-            "total_read": 0, "skipped_not_nim": 0,
-            "skipped_no_resp": 0, "skipped_no_feat": 0, "skipped_duplicate": 0,
-        }
+    m = _STUB_HEAD_RE.match(line)
+    if (m is None or line.count(b'"event_id"') != 1
+            or not line.rstrip(b" \t\r").endswith(b"}")
+            or b"NaN" in line or b"Infinity" in line):
+        return None
+    try:
+        return m.group(1).decode()
+    except UnicodeDecodeError:
+        return None
+
+
+def _lines_with_stub_ids(path, start, end):
+    """Yield (line, _stub_event_id(line)) for the lines in bytes [start, end).
+
+    The last line of the range gets None if it has no newline: it is the end of
+    the file and may be a torn write.
+    """
+    with open(path, "rb") as f:
+        f.seek(max(end - 1, 0))
+        terminated = f.read(1) == b"\n"
 
-    accepted          = []
-    seen_event_ids    = set()
-    skipped_not_nim   = 0
-    skipped_no_resp   = 0
-    skipped_no_feat   = 0
-    skipped_duplicate = 0
-    total_read        = 0
+    lines = iter_lines(path, start, end)
+    line  = next(lines, None)
+    while line is not None:
+        following = next(lines, None)
+        yield line, (_stub_event_id(line) if following is not None or terminated else None)
+        line = following
 
-    with log_path.open(encoding="utf-8") as f:
-        for line in f:
-            line = line.strip()
-            if not line:
-                continue
-            try:
-                event = json.loads(line)
-            except json.JSONDecodeError:
-                continue
 
-            total_read += 1
-            event_id = event.get("event_id")
+def _iter_log_range(path, start, end):
+    """Parse and classify the log lines in bytes [start, end) of `path`.
 
-            if event_id in seen_event_ids:
-                skipped_duplicate += 1
-                continue
-            seen_event_ids.add(event_id)
+    Yields (event_id, record or skip-counter name) in file order. With
+    PRESCREEN_STUBS, complete stub records are recognised by _stub_event_id and
+    not parsed. Lines that are not valid JSON (e.g. a torn final line) are
+    skipped.
+    """
+    if PRESCREEN_STUBS:
+        lines = _lines_with_stub_ids(path, start, end)
+    else:
+        lines = ((line, None) for line in iter_lines(path, start, end))
+    for line, stub_id in lines:
+        if stub_id is not None:
+            yield stub_id, "skipped_not_nim"
+            continue
+        try:
+            event = loads(line)
+        except ValueError:  # json.JSONDecodeError / orjson.JSONDecodeError
+            continue
+        yield event.get("event_id"), _classify_event(event)
 
-            # Only real NIM calls carry ground-truth Cosmos verdicts.
-            # Stub responses are predictable mocks, not valid training signal.
-            if not event.get("nim_called"):
-                skipped_not_nim += 1
-                continue
 
-            response = event.get("response_json")
-            if not response or not event.get("schema_valid"):
-                skipped_no_resp += 1
-                continue
+def _parse_log_range(path, start, end):
+    """Worker-process entry point: _iter_log_range collected into a list."""
+    return list(_iter_log_range(path, start, end))
 
-            intentional = response.get("intentional")
-            if intentional is None:
-                skipped_no_resp += 1
-                continue
 
-            features = event.get("features")
-            if not features or not REQUIRED_NUMERIC.issubset(features.keys()):
-                skipped_no_feat += 1
-                continue
+def _split_on_lines(path, size, n):
+    """Split [0, size) into up to n byte ranges that each end just after a newline."""
+    bounds = [0]
+    with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        for k in range(1, n):
+            nl = mm.find(b"\n", max(size * k // n, bounds[-1]))
+            if nl == -1:
+                break
+            bounds.append(nl + 1)
+    bounds.append(size)
+    return [(a, b) for a, b in zip(bounds, bounds[1:]) if b > a]
 
-            proposed     = event.get("proposed_intent")
-            gesture_type = features.get("gestureType") or proposed or "SWITCH_RIGHT"
 
-            accepted.append({
-                "event_id":      event_id,
-                "features":      features,
-                "gesture_type":  gesture_type,
-                "label":         1 if intentional else 0,
-                "cosmos_intent": response.get("final_intent"),
-            })
+def load_live_events(log_path):
+    """Read verifier_events.jsonl and extract calibration records.
 
-    return accepted, {
-        "total_read":        total_read,
-        "skipped_not_nim":   skipped_not_nim,
-        "skipped_no_resp":   skipped_no_resp,
-        "skipped_no_feat":   skipped_no_feat,
-        "skipped_duplicate": skipped_duplicate,
+    Inclusion criteria:
+      - nim_called=True        — real Cosmos NIM verdict, not stub
+      - response_json present and schema_valid=True
+      - features dict contains all 12 required numeric fields
+
+    Deduplication is by event_id (UUID generated per verify request).
+
+    Logs of PARALLEL_PARSE_MIN_BYTES or more are parsed and classified in
+    line-aligned chunks across worker processes; deduplication and counting
+    always run here, in file order.
+
+    Returns (accepted_list, counters_dict).
+    """
+    counts = {
+        "total_read": 0, "skipped_not_nim": 0,
+        "skipped_no_resp": 0, "skipped_no_feat": 0, "skipped_duplicate": 0,
     }
+    if not log_path.exists():
+        return [], counts
+
+    size    = log_path.stat().st_size
+    workers = os.cpu_count() or 1
+    if size < PARALLEL_PARSE_MIN_BYTES or workers < 2:
+        parsed = _iter_log_range(log_path, 0, size)   # streamed: duplicates are freed at once
+    else:
+        ranges = _split_on_lines(log_path, size, workers)
+        with ProcessPoolExecutor(max_workers=len(ranges)) as pool:
+            chunks = pool.map(_parse_log_range, [log_path] * len(ranges), *zip(*ranges))
+            parsed = [item for chunk in chunks for item in chunk]
+
+    accepted       = []
+    seen_event_ids = set()
+    for event_id, outcome in parsed:
+        counts["total_read"] += 1
+        if event_id in seen_event_ids:
+            counts["skipped_duplicate"] += 1
+            continue
+        seen_event_ids.add(event_id)
+
+        if isinstance(outcome, str):
+            counts[outcome] += 1
+        else:
+            accepted.append(outcome)
+
+    return accepted, counts
 
 
 # ─── Main ─────────────────────────────────────────────────────────────────────
 
 def main():
-    if not RESULTS_PATH.exists():
+    results = load_results()
+    if results is None:
         print(f"Results file not found: {RESULTS_PATH}")
         print("Run scripts/eval_cosmos.py first.")
         sys.exit(1)
 
-    with RESULTS_PATH.open() as f:
-        data = json.load(f)
-    results = data.get("results", [])
-
-    clips_by_key = load_clips_by_key()
+    needed_keys  = {(r.get("clip_id"), r.get("user_label", ""))
+                    for r in results if not r.get("cosmos_error")}
+    clips_by_key = load_clips_by_key(needed_keys)
 
     eval_accepted, eval_counts = load_eval_events(results, clips_by_key)
     live_accepted, live_counts = load_live_events(VERIFIER_LOG_PATH)
@@ -255,9 +383,9 @@ def main():
     all_accepted = eval_accepted + live_accepted
 
     CALIB_PATH.parent.mkdir(parents=True, exist_ok=True)
-    with CALIB_PATH.open("w") as f:
+    with CALIB_PATH.open("wb") as f:
         for record in all_accepted:
-            f.write(json.dumps(record) + "\n")
+            f.write(dumps(record) + b"\n")
 
     def label_counts(lst):
         tp = sum(1 for r in lst if r["label"] == 1)
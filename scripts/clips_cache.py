@@ -0,0 +1,78 @@
+"""Cached loading of recorded eval clip files.
+
+Both eval_cosmos.py and build_calibration.py read every clip_*.json in
+data/eval/clips/ and every eval_session_*.json in data/eval/sessions/. The
+parsed contents are pickled to data/eval/.clips_cache.pkl together with a hash
+of each file's path, mtime and size; later runs only stat the files and reuse
+the pickle when nothing has changed.
+
+Usage (from another script in this directory):
+    from clips_cache import load_clip_files
+    for path, data in load_clip_files():
+        ...
+"""
+
+import hashlib
+import os
+import pickle
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from jsonio import read_json
+
+REPO_ROOT    = Path(__file__).resolve().parents[1]
+CLIPS_DIR    = REPO_ROOT / "data" / "eval" / "clips"
+SESSIONS_DIR = REPO_ROOT / "data" / "eval" / "sessions"
+CACHE_PATH   = REPO_ROOT / "data" / "eval" / ".clips_cache.pkl"
+
+
+def load_json_files(paths):
+    """Parse many small JSON files concurrently, returning data in `paths` order."""
+    if not paths:
+        return []
+    with ThreadPoolExecutor(max_workers=min(16, len(paths))) as pool:
+        return list(pool.map(read_json, paths))
+
+
+def clip_file_paths():
+    """All clip files (sorted), followed by all session files (sorted)."""
+    paths = sorted(CLIPS_DIR.glob("clip_*.json"))
+    if SESSIONS_DIR.exists():
+        paths += sorted(SESSIONS_DIR.glob("eval_session_*.json"))
+    return paths
+
+
+def _manifest_hash(paths):
+    h = hashlib.sha256()
+    for p in paths:
+        st = p.stat()
+        h.update(f"{p}\0{st.st_mtime_ns}\0{st.st_size}\n".encode())
+    return h.hexdigest()
+
+
+def load_clip_files():
+    """Return [(path, parsed JSON)] for every clip and session file.
+
+    Each call returns freshly unpickled objects, so callers may mutate them.
+    """
+    paths         = clip_file_paths()
+    manifest_hash = _manifest_hash(paths)
+
+    try:
+        with CACHE_PATH.open("rb") as f:
+            cached = pickle.load(f)
+        if cached["manifest_hash"] == manifest_hash:
+            return list(zip(paths, cached["files"]))
+    except Exception:
+        pass  # missing, stale-format or corrupt cache: rebuild below
+
+    files = load_json_files(paths)
+    try:
+        tmp_path = CACHE_PATH.with_suffix(".tmp")
+        with tmp_path.open("wb") as f:
+            pickle.dump({"manifest_hash": manifest_hash, "files": files}, f,
+                        protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, CACHE_PATH)
+    except OSError as e:
+        print(f"  [warn] could not write clip cache {CACHE_PATH}: {e}")
+    return list(zip(paths, files))
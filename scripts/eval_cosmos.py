@@ -2,8 +2,11 @@
 """Batch Cosmos evaluation for recorded eval clips.
 
 Reads all clip JSON files from data/eval/clips/ (or a session JSON downloaded
-from the web app), sends each clip to the verifier service, collects Cosmos
-responses, and writes a results file with per-clip labels.
+from the web app), sends each clip to the verifier service, and appends each
+Cosmos response with its per-clip label to data/eval/results/eval_results.jsonl
+as soon as it arrives. A summary with the final metrics is written to
+eval_results_summary.json at the end. Pass --resume to skip clips already in
+the JSONL after an interrupted run.
 
 Prints a precision/recall/F1 table and confusion matrix.
 
@@ -11,6 +14,7 @@ Usage:
     python scripts/eval_cosmos.py
     python scripts/eval_cosmos.py --verifier http://192.168.1.250:8788
     python scripts/eval_cosmos.py --clips data/eval/clips/eval_session_2026-03-01.json
+    python scripts/eval_cosmos.py --resume
 
 The results from this script are the metrics table for the competition submission.
 Feed the output to scripts/build_calibration.py to generate the frozen
@@ -18,16 +22,27 @@ calibration set for student model regression checks.
 """
 
 import argparse
-import json
+import http.client
 import sys
+import threading
 import time
-import urllib.error
-import urllib.request
+import urllib.parse
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
 
+from clips_cache import load_clip_files
+from jsonio import dumps, loads, read_json
+
 REPO_ROOT   = Path(__file__).resolve().parents[1]
 CLIPS_DIR   = REPO_ROOT / "data" / "eval" / "clips"
 RESULTS_DIR = REPO_ROOT / "data" / "eval" / "results"
+RESULTS_PATH = RESULTS_DIR / "eval_results.jsonl"
+SUMMARY_PATH = RESULTS_DIR / "eval_results_summary.json"
+
+# Largest /verify_batch request the verifier accepts (VERIFY_BATCH_MAX in
+# verifier/verifier/main.py); bigger batches are rejected with 422.
+VERIFY_BATCH_MAX = 32
 
 # For clips with no gesture_detected, map label to a plausible proposed_intent
 LABEL_DEFAULT_INTENT = {
@@ -44,6 +59,7 @@ LABEL_DEFAULT_INTENT = {
 }
 
 TP_LABELS = frozenset(["TP_OPEN_MENU", "TP_CLOSE_MENU", "TP_SWITCH_RIGHT", "TP_SWITCH_LEFT"])
+GESTURE_TYPES = ("OPEN_MENU", "CLOSE_MENU", "SWITCH_RIGHT", "SWITCH_LEFT")
 
 
 # ─── Clip loading ──────────────────────────────────────────────────────────────
@@ -54,16 +70,12 @@ def load_clips(extra_path=None):
     clips = []
 
     if extra_path:
-        p = Path(extra_path)
-        with p.open() as f:
-            data = json.load(f)
+        data = read_json(Path(extra_path))
         clips = data if isinstance(data, list) else [data]
         return clips
 
-    # Individual clip files
-    for p in sorted(CLIPS_DIR.glob("clip_*.json")):
-        with p.open() as f:
-            data = json.load(f)
+    # Individual clip files, then session files (downloaded from browser)
+    for p, data in load_clip_files():
         if isinstance(data, list):
             for clip in data:
                 clip.setdefault("_session_id", p.stem)
@@ -72,27 +84,46 @@ def load_clips(extra_path=None):
             data.setdefault("_session_id", p.stem)
             clips.append(data)
 
-    # Session files (downloaded from browser)
-    sessions_dir = CLIPS_DIR.parent / "sessions"
-    if sessions_dir.exists():
-        for p in sorted(sessions_dir.glob("eval_session_*.json")):
-            with p.open() as f:
-                data = json.load(f)
-            if isinstance(data, list):
-                for clip in data:
-                    clip.setdefault("_session_id", p.stem)
-                clips.extend(data)
-            else:
-                data.setdefault("_session_id", p.stem)
-                clips.append(data)
-
     return clips
 
 
+def load_results(path):
+    """Read previously streamed results, skipping a torn final line."""
+    results = []
+    if not path.exists():
+        return results
+    with path.open("rb") as f:
+        for line in f:
+            try:
+                results.append(loads(line))
+            except ValueError:
+                continue
+    return results
+
+
+def _result_key(session_id, clip_id, label):
+    return (session_id or "", clip_id, label)
+
+
+def dedupe_results(results):
+    """Keep one result per clip: the first successful one, else the first error.
+
+    A --resume run retries clips whose earlier result was a cosmos_error, so a
+    later successful record replaces the error recorded for the same clip.
+    """
+    chosen = {}
+    for r in results:
+        key  = _result_key(r.get("session_id"), r.get("clip_id"), r.get("user_label"))
+        kept = chosen.get(key)
+        if kept is None or (kept.get("cosmos_error") and not r.get("cosmos_error")):
+            chosen[key] = r
+    return list(chosen.values())
+
+
 # ─── Verifier call ────────────────────────────────────────────────────────────
 
-def send_to_verifier(clip, verifier_url):
-    """POST clip to /verify endpoint and return the parsed response dict."""
+def build_payload(clip):
+    """Build the /verify request body for one clip."""
     label            = clip.get("label", "")
     proposed_intent  = (clip.get("gesture_detected")
                         or LABEL_DEFAULT_INTENT.get(label, "SWITCH_RIGHT"))
@@ -105,26 +136,152 @@ def send_to_verifier(clip, verifier_url):
         payload["frames"] = clip["frames"]
     if clip.get("features"):
         payload["landmark_summary_json"] = clip.get("metadata", {})
+    return payload
+
+
+class VerifierHTTPError(Exception):
+    def __init__(self, code, reason):
+        super().__init__(f"HTTP {code}: {reason}")
+        self.code = code
+
+
+# One keep-alive connection per worker thread, so consecutive calls skip the
+# TCP (and TLS) handshake.
+_thread_local = threading.local()
+
+
+def _post_json(verifier_url, path, payload, timeout=60):
+    """POST payload as JSON over this thread's connection and return the parsed reply."""
+    parts   = urllib.parse.urlsplit(verifier_url)
+    body    = dumps(payload)
+    headers = {"Content-Type": "application/json"}
+
+    for attempt in range(2):
+        conn   = getattr(_thread_local, "conn", None)
+        reused = conn is not None
+        if conn is None:
+            conn_cls = (http.client.HTTPSConnection if parts.scheme == "https"
+                        else http.client.HTTPConnection)
+            conn = _thread_local.conn = conn_cls(parts.netloc, timeout=timeout)
+        conn.timeout = timeout
+        if conn.sock is not None:
+            conn.sock.settimeout(timeout)
+
+        try:
+            conn.request("POST", parts.path.rstrip("/") + path, body, headers)
+            resp = conn.getresponse()
+            data = resp.read()
+        except (http.client.RemoteDisconnected, ConnectionResetError, BrokenPipeError):
+            conn.close()
+            _thread_local.conn = None
+            if reused and attempt == 0:
+                continue  # server dropped the idle keep-alive connection; reconnect once
+            raise
+        except Exception:
+            conn.close()
+            _thread_local.conn = None
+            raise
+
+        if resp.status >= 400:
+            raise VerifierHTTPError(resp.status, resp.reason)
+        return loads(data)
 
-    data = json.dumps(payload).encode()
-    req  = urllib.request.Request(
-        f"{verifier_url}/verify",
-        data=data,
-        headers={"Content-Type": "application/json"},
-        method="POST",
-    )
+
+def send_to_verifier(clip, verifier_url):
+    """POST clip to /verify endpoint and return the parsed response dict."""
     try:
-        with urllib.request.urlopen(req, timeout=60) as resp:
-            return json.loads(resp.read())
-    except urllib.error.HTTPError as e:
-        return {"error": f"HTTP {e.code}: {e.reason}"}
+        return _post_json(verifier_url, "/verify", build_payload(clip))
     except Exception as e:
         return {"error": str(e)}
 
 
+# Cleared on the first 404/405 from a verifier that predates /verify_batch.
+_batch_supported = True
+_batch_lock      = threading.Lock()
+
+
+def send_batch_to_verifier(clips, verifier_url):
+    """POST clips to /verify_batch and return one response dict per clip, in order.
+
+    Falls back to one /verify call per clip when the verifier has no batch endpoint.
+    """
+    global _batch_supported
+    if _batch_supported:
+        try:
+            body = _post_json(verifier_url, "/verify_batch",
+                              {"clips": [build_payload(c) for c in clips]},
+                              timeout=60 * len(clips))
+            responses = body.get("responses", [])
+            if len(responses) != len(clips):
+                raise ValueError(f"expected {len(clips)} responses, got {len(responses)}")
+            return responses
+        except VerifierHTTPError as e:
+            if e.code not in (404, 405):
+                return [{"error": str(e)} for _ in clips]
+            with _batch_lock:
+                if _batch_supported:
+                    _batch_supported = False
+                    print("  [info] verifier has no /verify_batch endpoint; sending clips one at a time")
+        except Exception as e:
+            return [{"error": str(e)} for _ in clips]
+    return [send_to_verifier(c, verifier_url) for c in clips]
+
+
+class RateLimiter:
+    """Space call start times at least `interval` seconds apart across threads."""
+
+    def __init__(self, interval):
+        self._interval = interval
+        self._lock     = threading.Lock()
+        self._next     = time.monotonic()
+
+    def wait(self):
+        with self._lock:
+            now        = time.monotonic()
+            start      = max(now, self._next)
+            self._next = start + self._interval
+        if start > now:
+            time.sleep(start - now)
+
+
+def build_result(clip, resp):
+    cosmos_error = "error" in resp
+    return {
+        "clip_id":             clip["clip_id"],
+        "session_id":          clip.get("_session_id", ""),
+        "user_label":          clip.get("label", "?"),
+        "user_category":       clip.get("category"),
+        "gesture_detected":    clip.get("gesture_detected"),
+        "cosmos_intentional":  resp.get("intentional"),
+        "cosmos_final_intent": resp.get("final_intent"),
+        "cosmos_confidence":   resp.get("confidence"),
+        "cosmos_reason":       resp.get("reason_category"),
+        "cosmos_error":        cosmos_error,
+        "cosmos_error_msg":    resp.get("error") if cosmos_error else None,
+    }
+
+
 # ─── Metrics ──────────────────────────────────────────────────────────────────
 
-def compute_metrics(results):
+def tally_results(results):
+    """Count non-error results by (user_label, fired_intent, cosmos_intentional).
+
+    fired_intent is the gesture Cosmos accepted, or None when it rejected the clip
+    or answered with an intent outside the four gestures. Every metric below is a
+    sum over these few buckets, so the results list is scanned only once.
+    """
+    counts = Counter()
+    for r in results:
+        if r.get("cosmos_error"):
+            continue
+        intl   = bool(r.get("cosmos_intentional", False))
+        intent = r.get("cosmos_final_intent", "NONE")
+        fired  = intent if intl and intent in GESTURE_TYPES else None
+        counts[(r.get("user_label"), fired, intl)] += 1
+    return counts
+
+
+def compute_metrics(results, counts=None):
     """Compute per-gesture-type precision/recall/F1.
 
     For gesture X:
@@ -133,30 +290,22 @@ def compute_metrics(results):
       FP: any clip where Cosmos says intentional=True AND final_intent=X but user != TP_X
       TN: user=NEG_* AND Cosmos says intentional=False
     """
-    gesture_types = ["OPEN_MENU", "CLOSE_MENU", "SWITCH_RIGHT", "SWITCH_LEFT"]
+    if counts is None:
+        counts = tally_results(results)
     metrics = {}
-    for g in gesture_types:
+    for g in GESTURE_TYPES:
         tp = fp = fn = tn = 0
-        for r in results:
-            if r.get("cosmos_error"):
-                continue
-            user_label    = r.get("user_label", "")
-            cosmos_intl   = r.get("cosmos_intentional", False)
-            cosmos_intent = r.get("cosmos_final_intent", "NONE")
-
-            user_is_this  = user_label == f"TP_{g}"
-            user_is_neg   = user_label.startswith("NEG_")
-            cosmos_fired  = cosmos_intl and cosmos_intent == g
-
-            if user_is_this:
-                if cosmos_fired:
-                    tp += 1
+        this_label = f"TP_{g}"
+        for (user_label, fired, cosmos_intl), n in counts.items():
+            if user_label == this_label:
+                if fired == g:
+                    tp += n
                 else:
-                    fn += 1
-            elif cosmos_fired:
-                fp += 1
-            elif user_is_neg and not cosmos_intl:
-                tn += 1
+                    fn += n
+            elif fired == g:
+                fp += n
+            elif not cosmos_intl and (user_label or "").startswith("NEG_"):
+                tn += n
 
         precision = tp / (tp + fp) if (tp + fp) > 0 else 0.0
         recall    = tp / (tp + fn) if (tp + fn) > 0 else 0.0
@@ -184,20 +333,17 @@ def print_metrics(metrics, results):
     print(f"\nTotal clips: {len(results)}  |  Valid: {valid}  |  Errors: {errors}")
 
 
-def print_confusion_matrix(results):
+def print_confusion_matrix(results, counts=None):
     """Print user label (rows) vs Cosmos prediction (columns)."""
-    all_labels = sorted({r.get("user_label", "?") for r in results if not r.get("cosmos_error")})
-    cosmos_cols = ["OPEN_MENU", "CLOSE_MENU", "SWITCH_RIGHT", "SWITCH_LEFT", "NONE/reject"]
+    if counts is None:
+        counts = tally_results(results)
+    cosmos_cols = [*GESTURE_TYPES, "NONE/reject"]
 
-    counts = {}
-    for r in results:
-        if r.get("cosmos_error"):
-            continue
-        row = r.get("user_label", "?")
-        ci  = r.get("cosmos_final_intent", "NONE")
-        ci_intl = r.get("cosmos_intentional", False)
-        col = ci if (ci_intl and ci in cosmos_cols) else "NONE/reject"
-        counts[(row, col)] = counts.get((row, col), 0) + 1
+    cells = Counter()
+    for (user_label, fired, _), n in counts.items():
+        row = "?" if user_label is None else user_label
+        cells[(row, fired or "NONE/reject")] += n
+    all_labels = sorted({row for row, _ in cells})
 
     col_w = 14
     print("\n═══ Confusion Matrix (rows=user label, cols=Cosmos) ════════")
@@ -207,7 +353,7 @@ def print_confusion_matrix(results):
     for row in all_labels:
         line = f"{row:<20}"
         for col in cosmos_cols:
-            line += f"{counts.get((row, col), 0):>{col_w}}"
+            line += f"{cells[(row, col)]:>{col_w}}"
         print(line)
 
 
@@ -225,9 +371,25 @@ def main():
     )
     parser.add_argument(
         "--sleep", type=float, default=1.0,
-        help="Seconds to sleep between Cosmos calls to avoid hammering the GPU (default: 1.0)",
+        help="Minimum seconds between the starts of consecutive verifier requests, "
+             "to avoid hammering the GPU (default: 1.0)",
+    )
+    parser.add_argument(
+        "--concurrency", type=int, default=4,
+        help="Maximum number of verifier requests in flight at once (default: 4)",
+    )
+    parser.add_argument(
+        "--batch-size", type=int, default=8,
+        help=f"Clips per /verify_batch request, 1-{VERIFY_BATCH_MAX}; "
+             "1 sends each clip to /verify (default: 8)",
+    )
+    parser.add_argument(
+        "--resume", action="store_true",
+        help="Keep existing eval_results.jsonl and skip clips already recorded in it",
     )
     args = parser.parse_args()
+    if not 1 <= args.batch_size <= VERIFY_BATCH_MAX:
+        parser.error(f"--batch-size must be between 1 and {VERIFY_BATCH_MAX}")
 
     clips = load_clips(args.clips)
     if not clips:
@@ -242,57 +404,104 @@ def main():
 
     RESULTS_DIR.mkdir(parents=True, exist_ok=True)
 
-    results = []
-    for i, clip in enumerate(labeled):
-        label = clip.get("label", "?")
-        print(
-            f"[{i+1}/{len(labeled)}] {clip['clip_id']}  label={label}"
-            f"  frames={clip.get('num_frames', 0)} ...",
-            end="  ", flush=True,
-        )
-
-        resp         = send_to_verifier(clip, args.verifier)
-        cosmos_error = "error" in resp
-
-        result = {
-            "clip_id":             clip["clip_id"],
-            "session_id":          clip.get("_session_id", ""),
-            "user_label":          label,
-            "user_category":       clip.get("category"),
-            "gesture_detected":    clip.get("gesture_detected"),
-            "cosmos_intentional":  resp.get("intentional"),
-            "cosmos_final_intent": resp.get("final_intent"),
-            "cosmos_confidence":   resp.get("confidence"),
-            "cosmos_reason":       resp.get("reason_category"),
-            "cosmos_error":        cosmos_error,
-            "cosmos_error_msg":    resp.get("error") if cosmos_error else None,
-        }
-        results.append(result)
-
-        if cosmos_error:
-            print(f"ERROR: {resp['error']}")
-        else:
-            print(
-                f"intentional={resp.get('intentional')}"
-                f"  intent={resp.get('final_intent')}"
-                f"  conf={resp.get('confidence', 0):.2f}",
-            )
-            time.sleep(args.sleep)
-
-    # Write results
-    output = {
+    previous = load_results(RESULTS_PATH) if args.resume else []
+    if previous:
+        # Errored clips (e.g. during a verifier outage) are not done: retry them.
+        done_keys = {_result_key(r.get("session_id"), r.get("clip_id"), r.get("user_label"))
+                     for r in previous if not r.get("cosmos_error")}
+        remaining = [c for c in labeled
+                     if _result_key(c.get("_session_id"), c["clip_id"], c["label"]) not in done_keys]
+        print(f"  Resuming: {len(labeled) - len(remaining)} clips already in {RESULTS_PATH}.")
+        labeled = remaining
+
+    limiter    = RateLimiter(args.sleep)
+    batch_size = args.batch_size
+    batches    = [range(start, min(start + batch_size, len(labeled)))
+                  for start in range(0, len(labeled), batch_size)]
+
+    def verify(indices):
+        limiter.wait()
+        if batch_size == 1:
+            return [send_to_verifier(labeled[i], args.verifier) for i in indices]
+        return send_batch_to_verifier([labeled[i] for i in indices], args.verifier)
+
+    # Keep results in clip order regardless of completion order: finished
+    # results are buffered until every earlier clip has been written.
+    results     = [None] * len(labeled)
+    done        = 0
+    next_write  = 0
+    interrupted = False
+
+    def record(indices, responses):
+        nonlocal done
+        for i, resp in zip(indices, responses):
+            done  += 1
+            clip   = labeled[i]
+            result = build_result(clip, resp)
+            results[i] = result
+
+            progress = (f"[{done}/{len(labeled)}] {clip['clip_id']}  label={result['user_label']}"
+                        f"  frames={clip.get('num_frames', 0)}  ")
+            if result["cosmos_error"]:
+                print(progress + f"ERROR: {resp['error']}", flush=True)
+            else:
+                print(
+                    progress
+                    + f"intentional={resp.get('intentional')}"
+                    f"  intent={resp.get('final_intent')}"
+                    f"  conf={resp.get('confidence', 0):.2f}",
+                    flush=True,
+                )
+
+    with (RESULTS_PATH.open("ab" if args.resume else "wb") as out,
+          ThreadPoolExecutor(max_workers=max(1, args.concurrency)) as pool):
+        if out.tell() and RESULTS_PATH.read_bytes()[-1:] != b"\n":
+            out.write(b"\n")  # terminate a torn line left by an interrupted run
+        futures = {pool.submit(verify, indices): indices for indices in batches}
+        try:
+            for future in as_completed(futures):
+                record(futures[future], future.result())
+                while next_write < len(results) and results[next_write] is not None:
+                    out.write(dumps(results[next_write]) + b"\n")
+                    next_write += 1
+                out.flush()
+        except KeyboardInterrupt:
+            interrupted = True
+            print("\nInterrupted: cancelling queued batches, waiting for those in flight...", flush=True)
+            pool.shutdown(wait=True, cancel_futures=True)
+            for future, indices in futures.items():
+                if (future.done() and not future.cancelled() and future.exception() is None
+                        and results[indices[0]] is None):
+                    record(indices, future.result())
+            # Keep everything that finished, still in clip order; the gaps are
+            # what a --resume run verifies.
+            for result in results[next_write:]:
+                if result is not None:
+                    out.write(dumps(result) + b"\n")
+            out.flush()
+
+    if interrupted:
+        written = sum(r is not None for r in results)
+        print(f"Wrote {written}/{len(labeled)} results to {RESULTS_PATH}; "
+              f"rerun with --resume to verify the rest.")
+        sys.exit(130)
+
+    print(f"\nResults written to {RESULTS_PATH}")
+
+    results = dedupe_results(previous + results)
+    counts  = tally_results(results)
+    metrics = compute_metrics(results, counts)
+    summary = {
         "generated_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
         "verifier_url": args.verifier,
-        "total_clips":  len(labeled),
-        "results":      results,
+        "total_clips":  len(results),
+        "metrics":      metrics,
     }
-    out_path = RESULTS_DIR / "eval_results.json"
-    out_path.write_text(json.dumps(output, indent=2))
-    print(f"\nResults written to {out_path}")
+    SUMMARY_PATH.write_bytes(dumps(summary, indent=True))
+    print(f"Summary written to {SUMMARY_PATH}")
 
-    metrics = compute_metrics(results)
     print_metrics(metrics, results)
-    print_confusion_matrix(results)
+    print_confusion_matrix(results, counts)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,77 @@
+"""JSON helpers shared by the scripts in this directory.
+
+Uses orjson (C parser/encoder, bytes in and out) when it is installed and falls
+back to the stdlib json module otherwise. dumps() always returns bytes.
+"""
+
+import json
+import mmap
+
+try:
+    import orjson
+
+    HAVE_ORJSON = True
+    loads = orjson.loads
+    _BULK_JSONL = False
+
+    def dumps(obj, indent=False) -> bytes:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2 if indent else 0)
+except ImportError:
+    HAVE_ORJSON = False
+    loads = json.loads
+    _BULK_JSONL = True
+
+    def dumps(obj, indent=False) -> bytes:
+        return json.dumps(obj, indent=2 if indent else None).encode()
+
+
+def read_json(path):
+    """Parse a whole JSON file from a single read() of its bytes."""
+    return loads(path.read_bytes())
+
+
+def iter_lines(path, start=0, end=None):
+    """Yield the non-empty lines in bytes [start, end) of a file, without newlines.
+
+    Lines are sliced straight out of an mmap of the file: no decoding and no
+    strip(). Both JSON parsers accept the surrounding whitespace (including a
+    trailing carriage return) that strip() used to remove.
+    """
+    with open(path, "rb") as f:
+        try:
+            mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:  # empty file: nothing to map
+            return
+        with mm:
+            end = len(mm) if end is None else end
+            pos = start
+            while pos < end:
+                nl = mm.find(b"\n", pos, end)
+                if nl == -1:
+                    nl = end
+                if nl > pos:
+                    yield mm[pos:nl]
+                pos = nl + 1
+
+
+def load_jsonl(path):
+    """Parse every line of a JSONL file, skipping lines that are not valid JSON.
+
+    With the stdlib parser the file is parsed in one call as a JSON array (lines
+    joined by commas), about twice as fast as json.loads per line; orjson is
+    already at least as fast line by line. A malformed or blank line makes the
+    bulk parse fail, and the file is then parsed line by line instead.
+    """
+    if _BULK_JSONL:
+        data = path.read_bytes().rstrip()
+        try:
+            return loads(b"[" + data.replace(b"\n", b",") + b"]")
+        except ValueError:
+            pass
+    records = []
+    for line in iter_lines(path):
+        try:
+            records.append(loads(line))
+        except ValueError:  # json.JSONDecodeError / orjson.JSONDecodeError
+            continue
+    return records
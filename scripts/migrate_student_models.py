@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+"""One-time upgrade of student model files to the dict bundle format.
+
+student/service.py expects every models/student/*.joblib to be a dict with at
+least a "model" key (the format train_student.py writes). Early model files
+were bare estimators; this script wraps any such file in place so the service
+no longer needs a legacy branch. Files that are already bundles are left alone.
+
+Usage:
+    python scripts/migrate_student_models.py
+"""
+
+import os
+import sys
+from pathlib import Path
+
+import joblib
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+MODEL_DIR = REPO_ROOT / "models" / "student"
+
+
+def migrate(path: Path) -> bool:
+    """Wrap a bare estimator file as a bundle. Returns True if it was rewritten."""
+    data = joblib.load(path)
+    if isinstance(data, dict):
+        return False
+
+    bundle = {
+        "model":      data,
+        "version":    "v?",
+        "model_type": type(data).__name__,
+    }
+    # Same layout as train_student.py: versioned backups are compressed,
+    # current_model.joblib (reloaded by the service) is not.
+    compress = 3 if path.name.startswith("v") else 0
+    tmp_path = path.with_suffix(".tmp")
+    joblib.dump(bundle, tmp_path, compress=compress)
+    os.replace(tmp_path, path)
+    return True
+
+
+def main():
+    paths = sorted(MODEL_DIR.glob("*.joblib"))
+    if not paths:
+        print(f"No model files in {MODEL_DIR}")
+        return 0
+
+    migrated = 0
+    for path in paths:
+        try:
+            changed = migrate(path)
+        except Exception as e:
+            print(f"  [error] {path.name}: {e}")
+            continue
+        print(f"  {path.name}: {'migrated' if changed else 'ok'}")
+        migrated += changed
+
+    print(f"{migrated} of {len(paths)} file(s) migrated")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
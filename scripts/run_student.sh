@@ -10,4 +10,11 @@ fi
 source .venv/bin/activate
 pip install -q -r requirements.txt
 
-STUDENT_MODE=${STUDENT_MODE:-shadow} python service.py
+# --preload imports service.py (and loads the model) once in the master, then
+# forks workers that start with the model already in memory. Each worker still
+# reloads it on its own when current_model.joblib changes.
+STUDENT_MODE=${STUDENT_MODE:-shadow} exec gunicorn \
+  --workers "${STUDENT_WORKERS:-4}" \
+  --bind 0.0.0.0:8789 \
+  --preload \
+  service:app
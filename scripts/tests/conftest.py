@@ -0,0 +1,5 @@
+import sys
+from pathlib import Path
+
+# The scripts import each other as siblings (`from jsonio import ...`).
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
@@ -0,0 +1,104 @@
+import json
+
+import pytest
+
+import build_calibration
+from jsonio import iter_lines
+
+FEATURES = {name: 0.5 for name in sorted(build_calibration.REQUIRED_NUMERIC)}
+
+
+def record(event_id, nim_called=False, **extra):
+    return {
+        "event_id": event_id,
+        "ts_request_received_unix": 1760000000.123456,
+        "proposed_intent": "OPEN_MENU",
+        "nim_called": nim_called,
+        "latency_ms": 0.25,
+        "response_json": {"intentional": True, "final_intent": "OPEN_MENU"},
+        "schema_valid": True,
+        "features": FEATURES,
+        **extra,
+    }
+
+
+def compact(rec):
+    return json.dumps(rec, separators=(",", ":")).encode()
+
+
+def spaced(rec):
+    return json.dumps(rec, ensure_ascii=True).encode()
+
+
+def parse_every_line(path, loads):
+    """load_live_events without the stub prescreen: the behaviour to match."""
+    counts = dict.fromkeys(["total_read", "skipped_not_nim", "skipped_no_resp",
+                            "skipped_no_feat", "skipped_duplicate"], 0)
+    accepted, seen = [], set()
+    for line in iter_lines(path):
+        try:
+            event = loads(line)
+        except ValueError:
+            continue
+        counts["total_read"] += 1
+        if event.get("event_id") in seen:
+            counts["skipped_duplicate"] += 1
+            continue
+        seen.add(event.get("event_id"))
+        outcome = build_calibration._classify_event(event)
+        if isinstance(outcome, str):
+            counts[outcome] += 1
+        else:
+            accepted.append(outcome)
+    return accepted, counts
+
+
+torn_stub = compact(record("torn"))[:-1]   # cut right after the features object: still ends in "}"
+
+LOGS = {
+    "stubs and nim records": [compact(record("a")), spaced(record("b")), compact(record("c", True)),
+                              spaced(record("d", True)), compact(record("a", True))],
+    "torn final line": [compact(record("a")), torn_stub],
+    "torn line glued to the next record": [torn_stub + compact(record("b", True)), compact(record("c"))],
+    "escaped event_id": [compact(record("q\\u0061")), compact(record("qa", True))],
+    "nan in a stub": [spaced(record("n", features={**FEATURES, "wristX": float("nan")})),
+                      compact(record("n", True))],
+    "crlf and blank lines": [compact(record("a")) + b"\r", b"", compact(record("b", True)) + b"\r"],
+}
+
+
+@pytest.mark.parametrize("name", LOGS)
+@pytest.mark.parametrize("loads", [build_calibration.loads, json.loads], ids=["jsonio", "stdlib"])
+@pytest.mark.parametrize("prescreen", [False, True])
+@pytest.mark.parametrize("parallel", [False, True])
+def test_live_events_match_a_full_parse(tmp_path, monkeypatch, name, loads, prescreen, parallel):
+    lines = LOGS[name]
+    path  = tmp_path / "verifier_events.jsonl"
+    path.write_bytes(b"\n".join(lines) + (b"" if lines[-1] is torn_stub else b"\n"))
+    monkeypatch.setattr(build_calibration, "loads", loads)
+    monkeypatch.setattr(build_calibration, "PRESCREEN_STUBS", prescreen)
+    if parallel:
+        monkeypatch.setattr(build_calibration, "PARALLEL_PARSE_MIN_BYTES", 0)
+        monkeypatch.setattr(build_calibration.os, "cpu_count", lambda: 2)
+
+    assert build_calibration.load_live_events(path) == parse_every_line(path, loads)
+
+
+def test_stub_event_id_only_for_one_complete_stub_record():
+    assert build_calibration._stub_event_id(compact(record("a"))) == "a"
+    assert build_calibration._stub_event_id(spaced(record("a"))) == "a"
+    assert build_calibration._stub_event_id(compact(record("a", True))) is None
+    assert build_calibration._stub_event_id(torn_stub + compact(record("b"))) is None
+    assert build_calibration._stub_event_id(compact(record("a", latency_ms=float("inf")))) is None
+
+
+def test_eval_events_prefer_a_resumed_success_over_the_error():
+    def result(error, intentional=None):
+        return {"clip_id": "c", "user_label": "TP_OPEN_MENU", "cosmos_error": error,
+                "cosmos_intentional": intentional, "cosmos_final_intent": "OPEN_MENU"}
+
+    clips = {("c", "TP_OPEN_MENU"): {"features": FEATURES}}
+    accepted, counts = build_calibration.load_eval_events(
+        [result(True), result(False, True), result(False, False)], clips)
+    assert [e["label"] for e in accepted] == [1]
+    assert counts["skipped_error"] == 0 and counts["skipped_duplicate"] == 2
@@ -0,0 +1,89 @@
+import json
+import time
+
+import pytest
+
+import eval_cosmos
+
+
+def make_clips(n):
+    return [{"clip_id": f"c{i}", "label": "TP_OPEN_MENU", "_session_id": "s"} for i in range(n)]
+
+
+def ok_response():
+    return {"intentional": True, "final_intent": "OPEN_MENU", "confidence": 0.9}
+
+
+@pytest.fixture
+def eval_env(tmp_path, monkeypatch):
+    monkeypatch.setattr(eval_cosmos, "RESULTS_DIR", tmp_path)
+    monkeypatch.setattr(eval_cosmos, "RESULTS_PATH", tmp_path / "eval_results.jsonl")
+    monkeypatch.setattr(eval_cosmos, "SUMMARY_PATH", tmp_path / "summary.json")
+
+    def run(clips, send_batch, *args):
+        monkeypatch.setattr(eval_cosmos, "load_clips", lambda path: clips)
+        monkeypatch.setattr(eval_cosmos, "send_batch_to_verifier", send_batch)
+        monkeypatch.setattr("sys.argv", ["eval_cosmos.py", "--sleep", "0", *args])
+        eval_cosmos.main()
+        return [json.loads(line) for line in (tmp_path / "eval_results.jsonl").read_text().splitlines()]
+
+    return run
+
+
+def test_interrupt_cancels_queued_batches_and_keeps_finished_results(eval_env, monkeypatch):
+    calls = []
+
+    def send_batch(clips, url):
+        calls.append([c["clip_id"] for c in clips])
+        time.sleep(0.05)
+        return [ok_response() for _ in clips]
+
+    real_as_completed = eval_cosmos.as_completed
+
+    def interrupted_as_completed(futures):
+        it = real_as_completed(futures)
+        yield next(it)
+        raise KeyboardInterrupt
+
+    monkeypatch.setattr(eval_cosmos, "as_completed", interrupted_as_completed)
+
+    with pytest.raises(SystemExit) as exc:
+        eval_env(make_clips(20), send_batch, "--concurrency", "1", "--batch-size", "2")
+    assert exc.value.code == 130
+    assert len(calls) < 10
+
+    path    = eval_cosmos.RESULTS_PATH
+    written = [json.loads(line)["clip_id"] for line in path.read_text().splitlines()]
+    assert written == [c for batch in calls for c in batch]
+
+
+def test_resume_retries_errored_clips_only(eval_env, tmp_path):
+    clips = make_clips(4)
+    sent  = []
+
+    def send_batch(failing):
+        def send(clips, url):
+            sent.extend(c["clip_id"] for c in clips)
+            return [{"error": "verifier down"} if c["clip_id"] in failing else ok_response() for c in clips]
+        return send
+
+    eval_env(clips, send_batch({"c2"}), "--batch-size", "2")
+    sent.clear()
+    lines = eval_env(clips, send_batch(set()), "--resume", "--batch-size", "2")
+
+    assert sent == ["c2"]
+    assert [(r["clip_id"], r["cosmos_error"]) for r in lines] == [
+        ("c0", False), ("c1", False), ("c2", True), ("c3", False), ("c2", False)]
+    summary = json.loads((tmp_path / "summary.json").read_text())
+    assert summary["total_clips"] == 4
+    assert summary["metrics"]["OPEN_MENU"]["tp"] == 4
+
+
+def test_dedupe_prefers_the_first_success_over_errors():
+    def result(clip_id, error, conf=None):
+        return {"clip_id": clip_id, "session_id": "s", "user_label": "TP_OPEN_MENU",
+                "cosmos_error": error, "cosmos_confidence": conf}
+
+    results = [result("a", True), result("a", False, 0.8), result("a", False, 0.9),
+               result("b", True, 0.1), result("b", True, 0.2)]
+    assert eval_cosmos.dedupe_results(results) == [result("a", False, 0.8), result("b", True, 0.1)]
@@ -0,0 +1,35 @@
+import json
+
+import pytest
+
+import jsonio
+
+FILES = {
+    "plain":            (b'{"a":1}\n{"b":[1,2]}\n', [{"a": 1}, {"b": [1, 2]}]),
+    "no final newline": (b'{"a":1}\n{"b":2}', [{"a": 1}, {"b": 2}]),
+    "crlf":             (b'{"a":1}\r\n{"b":2}\r\n', [{"a": 1}, {"b": 2}]),
+    "blank lines":      (b'\n{"a":1}\n\n{"b":2}\n\n', [{"a": 1}, {"b": 2}]),
+    "bad line":         (b'{"a":1}\nnot json\n{"b":2}\n', [{"a": 1}, {"b": 2}]),
+    "torn last line":   (b'{"a":1}\n{"b":', [{"a": 1}]),
+    "empty":            (b"", []),
+}
+
+
+@pytest.mark.parametrize("name", FILES)
+@pytest.mark.parametrize("bulk", [False, True], ids=["per-line", "bulk"])
+def test_load_jsonl(tmp_path, monkeypatch, name, bulk):
+    data, expected = FILES[name]
+    path = tmp_path / "data.jsonl"
+    path.write_bytes(data)
+    monkeypatch.setattr(jsonio, "_BULK_JSONL", bulk)
+    if bulk:
+        monkeypatch.setattr(jsonio, "loads", json.loads)   # the bulk path is the stdlib one
+
+    assert jsonio.load_jsonl(path) == expected
+
+
+def test_iter_lines_respects_the_byte_range(tmp_path):
+    path = tmp_path / "data.jsonl"
+    path.write_bytes(b"one\ntwo\n\nthree")
+    assert list(jsonio.iter_lines(path)) == [b"one", b"two", b"three"]
+    assert list(jsonio.iter_lines(path, 4, 9)) == [b"two"]
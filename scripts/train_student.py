@@ -16,13 +16,16 @@ Output:
 """
 
 import argparse
+import hashlib
 import json
+import os
 import sys
 import time
 from pathlib import Path
 
 import joblib
 import numpy as np
+import sklearn
 from sklearn.ensemble import RandomForestClassifier
 from sklearn.linear_model import LogisticRegression
 from sklearn.metrics import classification_report, confusion_matrix
@@ -32,6 +35,8 @@ from sklearn.pipeline import Pipeline
 from sklearn.preprocessing import StandardScaler
 from sklearn.svm import SVC
 
+from jsonio import load_jsonl
+
 try:
     from xgboost import XGBClassifier
     _XGBOOST_AVAILABLE = True
@@ -48,6 +53,7 @@ REPO_ROOT         = Path(__file__).resolve().parents[1]
 MODEL_DIR         = REPO_ROOT / "models" / "student"
 CALIB_PATH        = REPO_ROOT / "data" / "calibration" / "calibration.jsonl"
 DEFAULT_DATA_PATH = CALIB_PATH
+FIT_CACHE_DIR     = MODEL_DIR / "fit_cache"   # fitted candidates per (data, params, versions)
 
 FEATURE_NAMES = [
     "swipeDisplacement", "swipeDuration", "peakVelocity",
@@ -56,16 +62,37 @@ FEATURE_NAMES = [
     "wristVelocityX", "wristVelocityY", "stateConfidence",
 ]
 GESTURE_TYPES = ["OPEN_MENU", "CLOSE_MENU", "SWITCH_RIGHT", "SWITCH_LEFT"]
+GESTURE_IDX   = {g: len(FEATURE_NAMES) + i for i, g in enumerate(GESTURE_TYPES)}   # one-hot column
+N_COLS        = len(FEATURE_NAMES) + len(GESTURE_TYPES)
 MIN_SAMPLES   = 20
 REGRESS_LIMIT = 0.02   # reject update if calibration accuracy drops by more than this
+ACCURACY_TIE  = 0.005  # candidates this close to the best test accuracy count as tied
+
+# Relative per-prediction cost in student/service.py; lower wins an accuracy tie.
+INFERENCE_COST = {
+    "LogisticRegression": 0,   # one dot product
+    "RandomForest":       1,   # 10 trees x depth 3
+    "MLP":                2,
+    "LightGBM":           3,   # 100 trees x depth 6
+    "XGBoost":            3,
+    "SVM_RBF":            4,   # kernel against every support vector
+}
 
 
 # ─── Feature encoding ─────────────────────────────────────────────────────────
 
+def _fill_row(row: np.ndarray, features: dict, gesture_type: str) -> None:
+    """Write one encoded event into a zeroed row of length N_COLS."""
+    row[:len(FEATURE_NAMES)] = [features.get(n, 0.0) for n in FEATURE_NAMES]
+    col = GESTURE_IDX.get(gesture_type)
+    if col is not None:
+        row[col] = 1.0
+
+
 def features_to_row(features: dict, gesture_type: str) -> list:
-    numeric = [float(features.get(n, 0.0)) for n in FEATURE_NAMES]
-    onehot  = [1.0 if gesture_type == g else 0.0 for g in GESTURE_TYPES]
-    return numeric + onehot
+    row = np.zeros(N_COLS, dtype=np.float64)
+    _fill_row(row, features, gesture_type)
+    return row.tolist()
 
 
 # ─── Data loading ─────────────────────────────────────────────────────────────
@@ -86,37 +113,34 @@ def load_jsonl_events(path: Path) -> list[dict]:
         sys.exit(1)
 
     events = []
-    with path.open() as f:
-        for line in f:
-            line = line.strip()
-            if not line:
-                continue
-            try:
-                record = json.loads(line)
-            except json.JSONDecodeError:
-                continue
-
-            features     = record.get("features")
-            gesture_type = (features or {}).get("gestureType") or record.get("gesture_type")
-            label        = record.get("label")
-
-            if features is None or gesture_type is None or label is None:
-                continue
-
-            events.append({
-                "features":     features,
-                "gesture_type": gesture_type,
-                "label":        int(label),
-                "clip_id":      record.get("clip_id"),
-            })
+    for record in load_jsonl(path):
+        features     = record.get("features")
+        gesture_type = (features or {}).get("gestureType") or record.get("gesture_type")
+        label        = record.get("label")
+
+        if features is None or gesture_type is None or label is None:
+            continue
+
+        events.append({
+            "features":     features,
+            "gesture_type": gesture_type,
+            "label":        int(label),
+            "clip_id":      record.get("clip_id"),
+        })
 
     return events
 
 
 def build_matrix(events: list[dict]):
-    X = np.array([features_to_row(e["features"], e["gesture_type"]) for e in events],
-                 dtype=np.float32)
-    y = np.array([e["label"] for e in events], dtype=np.int32)
+    # Fill one preallocated array in place rather than building a list of row
+    # lists and coercing it with np.array(). Row-major on purpose: filling is
+    # row by row, and LogisticRegression.fit validates with order="C", so a
+    # Fortran-ordered matrix would only be copied back at fit time.
+    X = np.zeros((len(events), N_COLS), dtype=np.float32, order="C")
+    y = np.empty(len(events), dtype=np.int32)
+    for i, e in enumerate(events):
+        _fill_row(X[i], e["features"], e["gesture_type"])
+        y[i] = e["label"]
     return X, y
 
 
@@ -133,10 +157,16 @@ def filter_conflicting_clips(events: list[dict]) -> tuple[list[dict], int]:
     return filtered, len(events) - len(filtered)
 
 
-def load_calibration(path: Path = CALIB_PATH):
-    if not path.exists():
-        return None, None
-    events = load_jsonl_events(path)
+def load_calibration(path: Path = CALIB_PATH, events: list[dict] | None = None):
+    """Return the encoded (X, y) calibration set, or (None, None) if there is none.
+
+    Pass `events` when `path` has already been parsed (e.g. it is also the
+    training set) so the file is not read a second time.
+    """
+    if events is None:
+        if not path.exists():
+            return None, None
+        events = load_jsonl_events(path)
     if not events:
         return None, None
     return build_matrix(events)
@@ -144,10 +174,50 @@ def load_calibration(path: Path = CALIB_PATH):
 
 # ─── Training ─────────────────────────────────────────────────────────────────
 
+def _fit_cache_key(name: str, clf, X, y) -> str:
+    root = sys.modules[type(clf).__module__.split(".")[0]]
+    h = hashlib.blake2b(digest_size=16)
+    for part in (name, repr(clf.get_params()), sklearn.__version__,
+                 f"{root.__name__}=={getattr(root, '__version__', '?')}",
+                 f"{X.dtype}{X.shape}", f"{y.dtype}{y.shape}"):
+        h.update(part.encode() + b"\0")
+    h.update(np.ascontiguousarray(X).tobytes())
+    h.update(np.ascontiguousarray(y).tobytes())
+    return h.hexdigest()
+
+
+def fit_cached(name: str, clf, X, y):
+    """Fit clf on (X, y), or return the identical fit saved by an earlier run.
+
+    Fits are stored under FIT_CACHE_DIR keyed by the training arrays, the
+    estimator's parameters and the library versions, so retraining on an
+    unchanged dataset skips every fit.
+    """
+    key        = _fit_cache_key(name, clf, X, y)
+    cache_path = FIT_CACHE_DIR / f"{name}_{key}.joblib"
+    try:
+        return joblib.load(cache_path)
+    except Exception:
+        pass  # missing or unreadable: fit below
+
+    clf.fit(X, y)
+    try:
+        FIT_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        for stale in FIT_CACHE_DIR.glob(f"{name}_*.joblib"):
+            stale.unlink()
+        tmp_path = cache_path.with_suffix(".tmp")
+        joblib.dump(clf, tmp_path)
+        os.replace(tmp_path, cache_path)
+    except OSError as e:
+        print(f"  [warn] could not write fit cache {cache_path}: {e}")
+    return clf
+
+
 def train_and_pick(X_train, y_train, X_test, y_test, scale_pos_weight: float = 1.0):
     """Train LR, RF, SVM, XGBoost, LightGBM, MLP; return the best model."""
     candidates = [
-        ("LogisticRegression", LogisticRegression(max_iter=500, class_weight="balanced")),
+        ("LogisticRegression", LogisticRegression(max_iter=500, class_weight="balanced",
+                                                  solver="liblinear")),
         ("RandomForest",       RandomForestClassifier(max_depth=3, n_estimators=10,
                                                       class_weight="balanced", random_state=42)),
         ("SVM_RBF",            Pipeline([
@@ -180,17 +250,36 @@ def train_and_pick(X_train, y_train, X_test, y_test, scale_pos_weight: float = 1
 
     results = []
     for name, clf in candidates:
-        clf.fit(X_train, y_train)
+        clf = fit_cached(name, clf, X_train, y_train)
         acc = (clf.predict(X_test) == y_test).mean()
         print(f"  {name}: test accuracy = {acc:.3f}")
         results.append((acc, name, clf))
 
     results.sort(key=lambda t: t[0], reverse=True)
-    best_acc, best_name, best_clf = results[0]
+    top_acc = results[0][0]
+    # Among near-ties on accuracy, take the model that is cheapest to serve.
+    tied = [r for r in results if top_acc - r[0] < ACCURACY_TIE]
+    best_acc, best_name, best_clf = min(tied, key=lambda t: INFERENCE_COST.get(t[1], len(INFERENCE_COST)))
+    if best_name != results[0][1]:
+        print(f"  Within {ACCURACY_TIE} of {results[0][1]} (acc={top_acc:.3f}); preferring cheaper inference")
     print(f"  → Selected: {best_name} (acc={best_acc:.3f})")
     return best_clf, best_name, best_acc
 
 
+def quantization_params(X) -> dict:
+    """Per-column int16 affine parameters covering the observed range of X.
+
+    The student service uses them to run tree comparisons on int16 codes,
+    q = floor((x - zero_point) / scale), after checking the quantized model
+    against the float one.
+    """
+    lo = X.min(axis=0).astype(np.float64)
+    hi = X.max(axis=0).astype(np.float64)
+    zero_point = (lo + hi) / 2
+    scale      = np.where(hi > lo, (hi - lo) / 65000, 1.0)   # ±32500 codes span [lo, hi]
+    return {"scale": scale.tolist(), "zero_point": zero_point.tolist()}
+
+
 def next_version_num() -> int:
     existing = list(MODEL_DIR.glob("v*_model.joblib"))
     return len(existing) + 1
@@ -205,11 +294,16 @@ def main():
                              "(default: data/calibration/calibration.jsonl). "
                              "Produced by build_calibration.py; no threshold filtering is applied here.")
     args = parser.parse_args()
+    # One timestamp per run (when training started), shared by the bundle and the log.
+    run_timestamp = time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime())
 
     print("─── Loading training data ───")
     print(f"Source: {args.data}")
     events = load_jsonl_events(args.data)
     print(f"Loaded {len(events)} samples")
+    # The default training set is the calibration file itself; keep the
+    # unfiltered parse so the calibration set below does not re-read it.
+    calib_events = events if args.data.resolve() == CALIB_PATH.resolve() else None
 
     events, n_removed = filter_conflicting_clips(events)
     if n_removed:
@@ -286,7 +380,7 @@ def main():
     # ─────────────────────────────────────────────────────────────────────────
 
     print("\n─── Calibration set ───")
-    calib_X, calib_y = load_calibration()
+    calib_X, calib_y = load_calibration(events=calib_events)
     if calib_X is not None:
         print(f"Loaded {len(calib_y)} calibration examples from {CALIB_PATH}")
     else:
@@ -321,8 +415,7 @@ def main():
 
         current_path = MODEL_DIR / "current_model.joblib"
         if current_path.exists():
-            old_data = joblib.load(current_path)
-            old_model = old_data.get("model") if isinstance(old_data, dict) else old_data
+            old_model = joblib.load(current_path)["model"]
             calib_acc_old = (old_model.predict(calib_X) == calib_y).mean()
             print(f"Calibration set accuracy (old model): {calib_acc_old:.3f}")
             if calib_acc_new < calib_acc_old - REGRESS_LIMIT:
@@ -341,24 +434,31 @@ def main():
         "model":         new_model,
         "version":       version_str,
         "model_type":    model_type,
-        "timestamp":     time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        "timestamp":     run_timestamp,
         "num_samples":   len(events),
         "test_accuracy": round(float(test_acc), 4),
         "calib_accuracy": round(float(calib_acc_new), 4) if calib_acc_new is not None else None,
         "feature_names": feature_col_names,
+        "quantization":  quantization_params(X),
     }
 
     versioned_path = MODEL_DIR / f"{version_str}_model.joblib"
     current_path   = MODEL_DIR / "current_model.joblib"
 
-    joblib.dump(model_bundle, versioned_path)
-    joblib.dump(model_bundle, current_path)
+    # Backups are only reloaded by hand, so compress them. current_model stays
+    # uncompressed because the service reloads it whenever it changes; it is
+    # written aside and renamed into place so a running service never loads a
+    # half-written file.
+    joblib.dump(model_bundle, versioned_path, compress=3)
+    tmp_path = current_path.with_suffix(".tmp")
+    joblib.dump(model_bundle, tmp_path)
+    os.replace(tmp_path, current_path)
     print(f"\nSaved: {versioned_path}")
     print(f"Saved: {current_path}  (loaded by student service)")
 
     training_log = {
         "version":       version_str,
-        "timestamp":     model_bundle["timestamp"],
+        "timestamp":     run_timestamp,
         "num_samples":   len(events),
         "pos_samples":   pos,
         "neg_samples":   neg,
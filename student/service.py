@@ -8,18 +8,27 @@ Modes:
   active:           execute field reflects the actual model prediction.
 
 Set STUDENT_MODE=active to enable suppression.
-Model is loaded from models/student/current_model.joblib on first request.
+Model is loaded from models/student/current_model.joblib at import and reloaded
+when the file changes.
+
+Run with scripts/run_student.sh (gunicorn, STUDENT_WORKERS processes, model
+preloaded before forking) or `python service.py` for Flask's dev server.
+State such as the /status prediction count is per worker process.
 """
 
 import json
 import os
+import threading
 import time
 from pathlib import Path
 
 import joblib
 import numpy as np
+import sklearn
 from flask import Flask, jsonify, request
 from flask_cors import CORS
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.linear_model import LogisticRegression
 
 app = Flask(__name__)
 CORS(app)
@@ -27,6 +36,12 @@ CORS(app)
 REPO_ROOT          = Path(__file__).resolve().parents[1]
 MODEL_PATH         = REPO_ROOT / "models" / "student" / "current_model.joblib"
 TRAINING_LOG_PATH  = REPO_ROOT / "models" / "student" / "training_log.json"
+CALIB_PATH         = REPO_ROOT / "data" / "calibration" / "calibration.jsonl"
+QUANT_MAX_DISAGREE = 0.01   # reject the int16 forest if it flips more calibration predictions
+# The int16 forest is no faster than the float one here and may flip a few
+# predictions, so it is only tried when STUDENT_QUANTIZED_FOREST=1.
+QUANTIZED_FOREST   = os.environ.get("STUDENT_QUANTIZED_FOREST", "0") == "1"
+MODEL_CHECK_INTERVAL_S = 1.0   # how often requests stat MODEL_PATH for a newer model
 STUDENT_MODE       = os.environ.get("STUDENT_MODE", "shadow")
 
 FEATURE_NAMES = [
@@ -36,33 +51,205 @@ FEATURE_NAMES = [
     "wristVelocityX", "wristVelocityY", "stateConfidence",
 ]
 GESTURE_TYPES = ["OPEN_MENU", "CLOSE_MENU", "SWITCH_RIGHT", "SWITCH_LEFT"]
+_N_NUMERIC    = len(FEATURE_NAMES)
+_GEST_IDX     = {g: _N_NUMERIC + i for i, g in enumerate(GESTURE_TYPES)}   # one-hot column
+
+# Rows from _features_to_vector are always finite float32 of the fitted width,
+# so sklearn's per-call NaN/inf scan and parameter validation are redundant.
+# sklearn config is thread-local, so these are applied per call with
+# config_context rather than once with set_config() at import.
+_SKLEARN_FAST_CONFIG = {
+    key: True for key in ("assume_finite", "skip_parameter_validation")
+    if key in sklearn.get_config()   # skip_parameter_validation needs sklearn >= 1.3
+}
 
-_model         = None
+# (model, fast_proba) as one object: a reload swaps both at once, so a request
+# never pairs a new model with the previous model's fast predictor. fast_proba
+# maps a row to class probabilities without sklearn overhead, or is None.
+_predictor     = None
 _model_mtime   = None
 _model_version = None
 _model_type    = None
-_total_preds   = 0
+_last_check    = None   # time.monotonic() of the last MODEL_PATH stat
+_worker_preds  = 0      # predictions served by this process only (see /status)
+_feature_bufs  = threading.local()   # per-thread (1, 16) input row; Flask serves requests on threads
+
+
+def _quantize(x: np.ndarray, scale: np.ndarray, zero_point: np.ndarray) -> np.ndarray:
+    """Affine int16 codes: floor((x - zero_point) / scale), saturated."""
+    return np.clip(np.floor((x - zero_point) / scale), -32768, 32767).astype(np.int16)
+
+
+def _forest_predictor(rf, quantization: dict | None = None):
+    """Flatten a fitted RandomForestClassifier into padded (trees x nodes) arrays.
+
+    The returned function takes an (n, features) array and walks every tree for
+    every row at once, one level per step, averaging the leaf class
+    distributions exactly as predict_proba does.
+    With `quantization` (the bundle's per-feature scale/zero_point), thresholds
+    and inputs are compared as int16 codes instead; floor() keeps the order, so
+    only inputs in the same code as a threshold can take the other branch.
+    """
+    trees = [est.tree_ for est in rf.estimators_]
+    k, n  = len(trees), max(t.node_count for t in trees)
+    feature   = np.zeros((k, n), dtype=np.intp)
+    threshold = np.zeros((k, n), dtype=np.float64)
+    left      = np.zeros((k, n), dtype=np.intp)
+    right     = np.zeros((k, n), dtype=np.intp)
+    value     = np.zeros((k, n, rf.n_classes_), dtype=np.float64)
+    for i, t in enumerate(trees):
+        count = t.node_count
+        leaf  = t.children_left == -1
+        nodes = np.arange(count)
+        feature[i, :count]   = np.where(leaf, 0, t.feature)
+        threshold[i, :count] = t.threshold
+        left[i, :count]      = np.where(leaf, nodes, t.children_left)   # leaves loop on themselves
+        right[i, :count]     = np.where(leaf, nodes, t.children_right)
+        v = t.value[:, 0, :]
+        value[i, :count] = v / v.sum(axis=1, keepdims=True)
+    depth = max(t.max_depth for t in trees)
+    rows  = np.arange(k)
+
+    if quantization is not None:
+        scale      = np.asarray(quantization["scale"], dtype=np.float64)
+        zero_point = np.asarray(quantization["zero_point"], dtype=np.float64)
+        threshold  = _quantize(threshold, scale[feature], zero_point[feature])
+
+    def predict_proba(X: np.ndarray) -> np.ndarray:
+        if quantization is not None:
+            X = _quantize(X, scale, zero_point)
+        samples = np.arange(len(X))[:, None]
+        node    = np.zeros((len(X), k), dtype=np.intp)   # current node per (row, tree)
+        for _ in range(depth):
+            go_left = X[samples, feature[rows, node]] <= threshold[rows, node]
+            node    = np.where(go_left, left[rows, node], right[rows, node])
+        return value[rows, node].sum(axis=1) / k
+
+    return predict_proba
+
+
+def _linear_predictor(lr):
+    """Binary LogisticRegression as a dot product and a sigmoid."""
+    # Keep the fitted dtype so the dot product rounds like sklearn's own
+    # decision function (liblinear fits float64 coefficients).
+    coef      = lr.coef_[0]
+    intercept = lr.intercept_[0]
+
+    def predict_proba(X: np.ndarray) -> np.ndarray:
+        p = 1.0 / (1.0 + np.exp(-(X @ coef + intercept)))
+        return np.stack([1.0 - p, p], axis=1)
+
+    return predict_proba
+
+
+def _fast_predictor(model):
+    """Return a predict_proba replacement for RF/LR models, or None.
+
+    The replacement maps an (n, features) float32 array to (n, classes)
+    probabilities. sklearn's per-call input validation (and, for forests,
+    joblib dispatch) dominates inference on one row or a small batch. The replacement is only used if it agrees
+    with model.predict_proba on a fixed set of probe rows.
+    """
+    if type(model) is RandomForestClassifier and model.n_outputs_ == 1:
+        fn = _forest_predictor(model)
+    elif type(model) is LogisticRegression and model.coef_.shape[0] == 1:
+        fn = _linear_predictor(model)
+    else:
+        return None
+
+    probe = np.random.default_rng(0).normal(0.0, 2.0, (256, model.n_features_in_)).astype(np.float32)
+    try:
+        got      = fn(probe)
+        expected = model.predict_proba(probe)
+        # The matrix-vector product may round differently from sklearn's own
+        # matmul, so allow a few ulps of the model's own precision.
+        atol   = 16 * np.finfo(expected.dtype).eps
+        agrees = (np.allclose(got, expected, rtol=0, atol=atol)
+                  and (got.argmax(axis=1) == expected.argmax(axis=1)).all())
+    except Exception as exc:
+        print(f"[student] fast path unavailable ({exc}); using sklearn predict_proba", flush=True)
+        return None
+    if not agrees:
+        print("[student] fast path disagrees with sklearn; using sklearn predict_proba", flush=True)
+        return None
+    return fn
+
+
+def _calibration_rows() -> np.ndarray | None:
+    """Encode the calibration set the way /predict encodes a request."""
+    rows = []
+    try:
+        with CALIB_PATH.open("rb") as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    continue
+                features = record.get("features")
+                if not features:
+                    continue
+                gesture_type = features.get("gestureType") or record.get("gesture_type")
+                rows.append(_features_to_vector(features, gesture_type)[0].copy())
+    except OSError:
+        return None
+    return np.array(rows) if rows else None
+
+
+def verify_fp32(quantized, reference) -> bool:
+    """True if the quantized predictor picks the same class as the float one on
+    all but QUANT_MAX_DISAGREE of the calibration set."""
+    X = _calibration_rows()
+    if X is None:
+        print("[student] no calibration set to verify the int16 forest; keeping float32", flush=True)
+        return False
+    flips = int((quantized(X).argmax(axis=1) != reference(X).argmax(axis=1)).sum())
+    rate  = flips / len(X)
+    ok    = rate <= QUANT_MAX_DISAGREE
+    print(f"[student] int16 forest disagrees on {flips}/{len(X)} calibration rows "
+          f"({rate:.2%}) — {'using it' if ok else 'keeping float32'}", flush=True)
+    return ok
+
+
+def _sklearn_predict_proba(model, X: np.ndarray) -> np.ndarray:
+    with sklearn.config_context(**_SKLEARN_FAST_CONFIG):
+        return model.predict_proba(X)
 
 
 def _load_model_if_needed():
-    """Hot-reload model when the file changes on disk."""
-    global _model, _model_mtime, _model_version, _model_type
-    if not MODEL_PATH.exists():
-        _model = None
+    """Hot-reload model when the file changes on disk.
+
+    The file is stat()ed at most once per MODEL_CHECK_INTERVAL_S, so a new
+    model is picked up within that interval instead of on the very next request.
+    """
+    global _predictor, _model_mtime, _model_version, _model_type, _last_check
+    now = time.monotonic()
+    if _last_check is not None and now - _last_check < MODEL_CHECK_INTERVAL_S:
+        return
+    _last_check = now
+
+    try:
+        mtime = MODEL_PATH.stat().st_mtime
+    except FileNotFoundError:
+        _predictor = None
         _model_mtime = None
         _model_version = None
         _model_type = None
         return
-    mtime = MODEL_PATH.stat().st_mtime
-    if _model is None or mtime != _model_mtime:
-        data = joblib.load(MODEL_PATH)
-        if isinstance(data, dict):
-            _model         = data.get("model")
-            _model_version = data.get("version", "unknown")
-        else:
-            _model         = data
-            _model_version = "v?"
-        _model_mtime = mtime
+    if _predictor is None or mtime != _model_mtime:
+        # train_student.py always writes a dict bundle; older bare-estimator files
+        # are upgraded once by scripts/migrate_student_models.py.
+        data         = joblib.load(MODEL_PATH)
+        model        = data["model"]
+        quantization = data.get("quantization")
+        fast_proba   = _fast_predictor(model)
+        if (QUANTIZED_FOREST and fast_proba is not None and quantization
+                and type(model) is RandomForestClassifier):
+            quantized = _forest_predictor(model, quantization)
+            if verify_fp32(quantized, fast_proba):
+                fast_proba = quantized
+        _predictor     = (model, fast_proba)
+        _model_version = data.get("version", "unknown")
+        _model_mtime   = mtime
         try:
             log = json.loads(TRAINING_LOG_PATH.read_text())
             _model_type = log[-1].get("model_type") if log else None
@@ -71,33 +258,55 @@ def _load_model_if_needed():
         print(f"[student] loaded model version {_model_version} ({_model_type})", flush=True)
 
 
+def _fill_row(row: np.ndarray, features: dict, gesture_type: str) -> None:
+    row[:_N_NUMERIC] = [features.get(n, 0.0) for n in FEATURE_NAMES]
+    # NaN/inf (JSON NaN/Infinity, or float32 overflow) become 0.0 like a missing
+    # feature: predictions run with sklearn's finiteness check disabled.
+    np.nan_to_num(row[:_N_NUMERIC], copy=False, nan=0.0, posinf=0.0, neginf=0.0)
+    row[_N_NUMERIC:] = 0.0
+    # Any other "type" (missing, unknown, or a list/dict) leaves the one-hot at zero.
+    col = _GEST_IDX.get(gesture_type) if isinstance(gesture_type, str) else None
+    if col is not None:
+        row[col] = 1.0
+
+
 def _features_to_vector(features: dict, gesture_type: str) -> np.ndarray:
-    numeric = [float(features.get(n, 0.0)) for n in FEATURE_NAMES]
-    onehot  = [1.0 if gesture_type == g else 0.0 for g in GESTURE_TYPES]
-    return np.array(numeric + onehot, dtype=np.float32).reshape(1, -1)
+    """Encode into this thread's reusable row; valid until the thread's next call.
+
+    The row is always finite (see _fill_row), which _sklearn_predict_proba relies on.
+    """
+    buf = getattr(_feature_bufs, "buf", None)
+    if buf is None:
+        buf = _feature_bufs.buf = np.zeros((1, _N_NUMERIC + len(GESTURE_TYPES)), dtype=np.float32)
+    _fill_row(buf[0], features, gesture_type)
+    return buf
 
 
 @app.route("/predict", methods=["POST"])
 def predict():
-    global _total_preds
+    global _worker_preds
     _load_model_if_needed()
 
     body         = request.get_json(force=True, silent=True) or {}
     features     = body.get("features", {})
     gesture_type = body.get("type", "SWITCH_RIGHT")
 
-    if _model is None:
+    loaded = _predictor
+    if loaded is None:
         return jsonify({
             "execute": True, "confidence": 0.0,
             "model_version": None, "model_type": None, "mode": STUDENT_MODE,
         })
+    model, fast_proba = loaded
 
-    x    = _features_to_vector(features, gesture_type)
-    pred = bool(_model.predict(x)[0])
-    proba = _model.predict_proba(x)[0]
-    conf = float(max(proba))
+    # One forward pass: predict() would recompute these probabilities to argmax them.
+    x     = _features_to_vector(features, gesture_type)
+    proba = (fast_proba(x) if fast_proba is not None else _sklearn_predict_proba(model, x))[0]
+    idx   = int(proba.argmax())
+    pred  = bool(model.classes_[idx])
+    conf  = float(proba[idx])
 
-    _total_preds += 1
+    _worker_preds += 1
 
     # Shadow mode: always execute — predictions are for logging and analysis only
     execute = pred if STUDENT_MODE == "active" else True
@@ -111,14 +320,70 @@ def predict():
     })
 
 
+@app.route("/predict_batch", methods=["POST"])
+def predict_batch():
+    """Predict for {"items": [{"features": ..., "type": ...}, ...]} in one call.
+
+    Each item is handled exactly like a /predict body; "predictions" holds one
+    {"execute", "confidence"} per item, in order.
+    """
+    global _worker_preds
+    _load_model_if_needed()
+
+    body  = request.get_json(force=True, silent=True) or {}
+    items = body.get("items", [])
+    if not isinstance(items, list) or not all(isinstance(item, dict) for item in items):
+        return jsonify({"error": "items must be a list of objects"}), 400
+    if not all(isinstance(item.get("features", {}), dict) for item in items):
+        return jsonify({"error": "features must be an object"}), 400
+
+    meta   = {"model_version": _model_version, "model_type": _model_type, "mode": STUDENT_MODE}
+    loaded = _predictor
+    if loaded is None:
+        return jsonify({"predictions": [{"execute": True, "confidence": 0.0}] * len(items),
+                        **meta, "model_version": None, "model_type": None})
+    model, fast_proba = loaded
+
+    X = np.zeros((len(items), _N_NUMERIC + len(GESTURE_TYPES)), dtype=np.float32)
+    for row, item in zip(X, items):
+        _fill_row(row, item.get("features", {}), item.get("type", "SWITCH_RIGHT"))
+
+    if not items:
+        proba = np.empty((0, len(model.classes_)))
+    else:
+        # One call for the whole batch, on the fast path as well as through sklearn.
+        proba = fast_proba(X) if fast_proba is not None else _sklearn_predict_proba(model, X)
+    idx   = proba.argmax(axis=1)
+    preds = model.classes_[idx].astype(bool)
+    confs = proba[np.arange(len(idx)), idx]
+
+    _worker_preds += len(items)
+
+    # Shadow mode: always execute — predictions are for logging and analysis only
+    active = STUDENT_MODE == "active"
+    return jsonify({
+        "predictions": [
+            {"execute": bool(p) if active else True, "confidence": round(float(c), 3)}
+            for p, c in zip(preds, confs)
+        ],
+        **meta,
+    })
+
+
 @app.route("/status")
 def status():
+    """Model and mode, plus the prediction count of the worker that answered.
+
+    Under gunicorn each worker process counts separately, so worker_predictions
+    is not a service-wide total; worker_pid identifies which worker replied.
+    """
     _load_model_if_needed()
     return jsonify({
-        "model_loaded":     _model is not None,
-        "model_version":    _model_version,
-        "mode":             STUDENT_MODE,
-        "total_predictions": _total_preds,
+        "model_loaded":       _predictor is not None,
+        "model_version":      _model_version,
+        "mode":               STUDENT_MODE,
+        "worker_pid":         os.getpid(),
+        "worker_predictions": _worker_preds,
     })
 
 
@@ -127,6 +392,15 @@ def health():
     return jsonify({"status": "ok"})
 
 
+# Load at import so `gunicorn --preload` loads the model once in the master and
+# forks workers that already hold it. A model that fails to load here is
+# retried, and reported, by the first request as before.
+try:
+    _load_model_if_needed()
+except Exception as exc:
+    print(f"[student] could not load model at startup: {exc}", flush=True)
+
+
 if __name__ == "__main__":
     print(f"[student] starting on port 8789, mode={STUDENT_MODE}", flush=True)
     app.run(host="0.0.0.0", port=8789, debug=False)
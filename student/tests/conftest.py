@@ -0,0 +1,27 @@
+import sys
+from pathlib import Path
+
+import pytest
+
+# service.py is run from student/ and imported as a top-level module.
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+import service  # noqa: E402
+
+
+@pytest.fixture
+def load_model(tmp_path, monkeypatch):
+    """Point the service at a bundle holding `model` and load it."""
+    def load(model, version="test"):
+        import joblib
+
+        path = tmp_path / f"{version}.joblib"
+        joblib.dump({"model": model, "version": version}, path)
+        monkeypatch.setattr(service, "MODEL_PATH", path)
+        monkeypatch.setattr(service, "_last_check", None)
+        monkeypatch.setattr(service, "_model_mtime", None)
+        service._load_model_if_needed()
+        return service._predictor
+
+    monkeypatch.setattr(service, "_predictor", None)
+    return load
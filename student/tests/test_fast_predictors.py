@@ -0,0 +1,57 @@
+import numpy as np
+import pytest
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.linear_model import LogisticRegression
+
+import service
+
+N_COLS = service._N_NUMERIC + len(service.GESTURE_TYPES)
+
+
+def training_data(n=400, seed=0):
+    rng = np.random.default_rng(seed)
+    X   = rng.normal(size=(n, N_COLS)).astype(np.float32)
+    y   = (X[:, 0] + 0.5 * X[:, 3] - X[:, 7] > 0).astype(np.int32)
+    return X, y
+
+
+MODELS = {
+    "lr-liblinear": lambda: LogisticRegression(max_iter=500, class_weight="balanced", solver="liblinear"),
+    "lr-lbfgs":     lambda: LogisticRegression(max_iter=500),
+    "rf":           lambda: RandomForestClassifier(max_depth=3, n_estimators=10, random_state=42),
+}
+
+
+@pytest.mark.parametrize("name", MODELS)
+def test_fast_predictor_matches_sklearn(name):
+    X, y  = training_data()
+    model = MODELS[name]().fit(X, y)
+    fast  = service._fast_predictor(model)
+    assert fast is not None
+
+    rows     = training_data(200, seed=1)[0]
+    got      = fast(rows)
+    expected = model.predict_proba(rows)
+    np.testing.assert_allclose(got, expected, rtol=0, atol=1e-6)
+    assert (got.argmax(axis=1) == expected.argmax(axis=1)).all()
+    np.testing.assert_allclose(fast(rows[:1]), expected[:1], rtol=0, atol=1e-6)
+
+
+def test_unsupported_model_has_no_fast_path():
+    from sklearn.naive_bayes import GaussianNB
+
+    X, y = training_data()
+    assert service._fast_predictor(GaussianNB().fit(X, y)) is None
+
+
+def test_reload_swaps_model_and_fast_predictor_together(load_model):
+    X, y = training_data()
+    lr   = MODELS["lr-liblinear"]().fit(X, y)
+    rf   = MODELS["rf"]().fit(X, y)
+
+    model, fast = load_model(lr, "v1")
+    assert type(model) is LogisticRegression
+    np.testing.assert_allclose(fast(X[:1]), lr.predict_proba(X[:1]), atol=1e-6)
+    model, fast = load_model(rf, "v2")
+    assert type(model) is RandomForestClassifier
+    np.testing.assert_allclose(fast(X[:1]), rf.predict_proba(X[:1]), atol=1e-6)
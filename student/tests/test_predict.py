@@ -0,0 +1,62 @@
+import numpy as np
+import pytest
+from sklearn.linear_model import LogisticRegression
+
+import service
+
+N_COLS = service._N_NUMERIC + len(service.GESTURE_TYPES)
+
+
+@pytest.fixture
+def client(load_model):
+    rng = np.random.default_rng(0)
+    X   = rng.normal(size=(200, N_COLS)).astype(np.float32)
+    y   = (X[:, 0] > 0).astype(np.int32)
+    load_model(LogisticRegression(solver="liblinear").fit(X, y))
+    return service.app.test_client()
+
+
+@pytest.mark.parametrize("gesture_type", [["OPEN_MENU"], {"a": 1}, 3, None, "NOT_A_GESTURE"])
+def test_non_gesture_type_leaves_the_one_hot_empty(client, gesture_type):
+    resp = client.post("/predict", json={"features": {"wristX": 0.5}, "type": gesture_type})
+    assert resp.status_code == 200
+
+    row = np.ones(N_COLS, dtype=np.float32)
+    service._fill_row(row, {"wristX": 0.5}, gesture_type)
+    assert not row[service._N_NUMERIC:].any()
+
+
+def test_status_reports_per_worker_prediction_count(client):
+    before = client.get("/status").get_json()
+    client.post("/predict", json={"features": {}, "type": "OPEN_MENU"})
+    after  = client.get("/status").get_json()
+    assert "total_predictions" not in after
+    assert after["worker_pid"] == before["worker_pid"]
+    assert after["worker_predictions"] == before["worker_predictions"] + 1
+
+
+@pytest.mark.parametrize("body", [
+    {"items": {"features": {}}},
+    {"items": [["OPEN_MENU"]]},
+    {"items": [{"features": None}]},
+    {"items": [{"features": [0.5]}]},
+])
+def test_predict_batch_rejects_malformed_items(client, body):
+    assert client.post("/predict_batch", json=body).status_code == 400
+
+
+def test_predict_batch_matches_per_item_predict(client):
+    rng   = np.random.default_rng(1)
+    items = [{"features": {"wristX": float(x), "wristY": float(y)}, "type": t}
+             for (x, y), t in zip(rng.normal(size=(20, 2)), service.GESTURE_TYPES * 5)]
+    items.append({"type": "OPEN_MENU"})   # missing features count as all-zero
+
+    batch = client.post("/predict_batch", json={"items": items}).get_json()["predictions"]
+    assert batch == [{k: client.post("/predict", json=item).get_json()[k]
+                      for k in ("execute", "confidence")} for item in items]
+
+
+def test_predict_batch_of_nothing(client):
+    resp = client.post("/predict_batch", json={"items": []})
+    assert resp.status_code == 200
+    assert resp.get_json()["predictions"] == []
@@ -0,0 +1,5 @@
+import sys
+from pathlib import Path
+
+# Import the service as `verifier.main` without installing the package.
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
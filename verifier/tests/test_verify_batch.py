@@ -0,0 +1,46 @@
+from fastapi.testclient import TestClient
+
+import verifier.main as main
+
+
+def clip(event_id, intent="OPEN_MENU", **extra):
+    return {"event_id": event_id, "proposed_intent": intent, **extra}
+
+
+def post_batch(tmp_path, monkeypatch, clips, **params):
+    monkeypatch.setattr(main, "VERIFIER_LOG_PATH", tmp_path / "verifier_events.jsonl")
+    with TestClient(main.app) as client:
+        return client.post("/verify_batch", json={"clips": clips}, params=params)
+
+
+def test_responses_follow_request_order(tmp_path, monkeypatch):
+    intents = ["OPEN_MENU", "CLOSE_MENU", "SWITCH_RIGHT", "SWITCH_LEFT"] * 5
+    resp = post_batch(tmp_path, monkeypatch, [clip(f"e{i}", intent) for i, intent in enumerate(intents)])
+    assert resp.status_code == 200
+    assert [r["proposed_intent"] for r in resp.json()["responses"]] == intents
+
+
+def test_failed_clip_gets_an_error_entry(tmp_path, monkeypatch):
+    stub = main.build_stub_response
+
+    def build_stub_response(event_id, proposed_intent, force_reject=False):
+        response = stub(event_id, proposed_intent, force_reject)
+        return {**response, "confidence": 7.0} if event_id == "bad" else response
+
+    monkeypatch.setattr(main, "build_stub_response", build_stub_response)
+    resp = post_batch(tmp_path, monkeypatch, [clip("ok1"), clip("bad"), clip("ok2")])
+    assert resp.status_code == 200
+    ok1, bad, ok2 = resp.json()["responses"]
+    assert ok1["intentional"] and ok2["intentional"]
+    assert bad["event_id"] == "bad" and "Schema validation failed" in bad["error"]
+
+
+def test_force_reject_applies_to_every_clip(tmp_path, monkeypatch):
+    resp = post_batch(tmp_path, monkeypatch, [clip("a"), clip("b")], force_reject="true")
+    assert [r["intentional"] for r in resp.json()["responses"]] == [False, False]
+
+
+def test_batch_size_is_bounded(tmp_path, monkeypatch):
+    clips = [clip(f"e{i}") for i in range(main.VERIFY_BATCH_MAX + 1)]
+    assert post_batch(tmp_path, monkeypatch, clips).status_code == 422
+    assert post_batch(tmp_path, monkeypatch, []).status_code == 422
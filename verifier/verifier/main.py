@@ -1,21 +1,40 @@
 import json
 import os
+import queue
+import sys
+import threading
 import time
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from typing import Any, Literal
 
 from fastapi import FastAPI, HTTPException, Query
 from fastapi.middleware.cors import CORSMiddleware
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 
 from .schema_validate import validate_response
-from .stub_logic import build_stub_response
+from .stub_logic import build_reject_response, build_stub_response
 from .nim_logic import call_cosmos_nim
 
+try:
+    import orjson
+
+    def _jsonl_line(record: dict) -> bytes:
+        # NIM responses are free-form JSON, so tolerate non-string dict keys too.
+        return orjson.dumps(record, option=orjson.OPT_APPEND_NEWLINE | orjson.OPT_NON_STR_KEYS)
+except ImportError:
+    def _jsonl_line(record: dict) -> bytes:
+        return (json.dumps(record, ensure_ascii=True) + "\n").encode("ascii")
+
 # Set NIM_ENABLED=1 to route verify requests through the real Cosmos NIM.
 # Leave unset (or set to 0) to use the stub (fast, no GPU required).
 NIM_ENABLED = os.environ.get("NIM_ENABLED", "0") == "1"
 
+# Upper bound on clips per /verify_batch call, and how many of them are verified
+# at once. Concurrent NIM requests let vLLM batch the model forwards on the GPU.
+VERIFY_BATCH_MAX = 32
+VERIFY_BATCH_WORKERS = int(os.environ.get("VERIFY_BATCH_WORKERS", "8"))
+
 Intent = Literal["OPEN_MENU", "CLOSE_MENU", "SWITCH_RIGHT", "SWITCH_LEFT"]
 
 REPO_ROOT = Path(__file__).resolve().parents[2]
@@ -61,16 +80,115 @@ class VerifyResponse(BaseModel):
     ]
     rationale: str
 
-def append_jsonl(path: Path, record: dict) -> None:
-    path.parent.mkdir(parents=True, exist_ok=True)
-    with path.open("a", encoding="utf-8") as f:
-        f.write(json.dumps(record, ensure_ascii=True) + "\n")
-        f.flush()
+
+class VerifyBatchRequest(BaseModel):
+    clips: list[VerifyRequest] = Field(min_length=1, max_length=VERIFY_BATCH_MAX)
+
+
+class VerifyBatchError(BaseModel):
+    event_id: str
+    error: str
+
+
+class VerifyBatchResponse(BaseModel):
+    responses: list[VerifyResponse | VerifyBatchError]
+
+
+# Same writer as executor/executor/main.py (the services are separate packages);
+# keep the two copies, including their error handling, identical.
+class JsonlWriter:
+    """Append JSONL records to a file from a background thread.
+
+    Handlers enqueue records and return immediately. The writer thread serializes
+    records into one buffer and flushes it with a single os.write() once 64 KiB
+    have accumulated or 50 ms after the first buffered record, whichever comes
+    first. The file is opened once with O_APPEND, so each flush is one atomic
+    append and no open()/close() happens after startup.
+    """
+
+    FLUSH_BYTES = 64 * 1024
+    FLUSH_INTERVAL_S = 0.05
+    CLOSE_TIMEOUT_S = 5.0
+
+    _STOP = object()
+
+    def __init__(self, path: Path, maxsize: int = 10_000) -> None:
+        self._fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_APPEND, 0o644)
+        self._queue: queue.Queue = queue.Queue(maxsize=maxsize)
+        self._thread = threading.Thread(target=self._run, name="jsonl-writer", daemon=True)
+        self._thread.start()
+
+    def put(self, record: dict) -> None:
+        try:
+            self._queue.put_nowait(record)
+        except queue.Full:
+            print(f"[verifier] log queue full, dropping event {record.get('event_id')}",
+                  file=sys.stderr, flush=True)
+
+    def close(self) -> None:
+        try:
+            self._queue.put(self._STOP, timeout=self.CLOSE_TIMEOUT_S)
+        except queue.Full:
+            print("[verifier] log queue still full at shutdown; unwritten events are lost",
+                  file=sys.stderr, flush=True)
+        self._thread.join(timeout=self.CLOSE_TIMEOUT_S)
+        if not self._thread.is_alive():
+            os.close(self._fd)
+
+    def _run(self) -> None:
+        buf = bytearray()
+        deadline = 0.0
+        while True:
+            timeout = max(0.0, deadline - time.monotonic()) if buf else None
+            try:
+                item = self._queue.get(timeout=timeout)
+            except queue.Empty:
+                item = None
+            if item is self._STOP:
+                break
+            if item is not None:
+                if not buf:
+                    deadline = time.monotonic() + self.FLUSH_INTERVAL_S
+                buf += self._encode(item)
+                if len(buf) < self.FLUSH_BYTES and time.monotonic() < deadline:
+                    continue
+            self._write(self._fd, buf)
+            buf.clear()
+        self._write(self._fd, buf)
+
+    @staticmethod
+    def _encode(record: dict) -> bytes:
+        # One record that cannot be encoded must not stop the writer thread.
+        try:
+            return _jsonl_line(record)
+        except Exception:
+            pass  # e.g. orjson rejects integers beyond 64 bits; the stdlib encoder does not
+        try:
+            return (json.dumps(record, ensure_ascii=True) + "\n").encode("ascii")
+        except Exception as exc:
+            print(f"[verifier] cannot encode event {record.get('event_id')}, dropping it: {exc}",
+                  file=sys.stderr, flush=True)
+            return b""
+
+    @staticmethod
+    def _write(fd: int, buf: bytearray) -> None:
+        view = memoryview(buf)
+        try:
+            while view:
+                view = view[os.write(fd, view):]
+        except OSError as exc:
+            print(f"[verifier] failed to write event log: {exc}", file=sys.stderr, flush=True)
 
 
 @app.on_event("startup")
 def _ensure_verifier_log_dir() -> None:
     VERIFIER_LOG_PATH.parent.mkdir(parents=True, exist_ok=True)
+    app.state.event_log = JsonlWriter(VERIFIER_LOG_PATH)
+
+
+@app.on_event("shutdown")
+def _close_event_log() -> None:
+    app.state.event_log.close()
 
 
 @app.get("/health")
@@ -80,7 +198,7 @@ def health() -> dict:
 
 @app.post("/verify", response_model=VerifyResponse)
 def verify(req: VerifyRequest, force_reject: bool = Query(default=False)) -> VerifyResponse:
-    started = time.perf_counter()
+    started_ns = time.perf_counter_ns()
     ts_request_received_unix = time.time()
     log_written = False
 
@@ -89,7 +207,11 @@ def verify(req: VerifyRequest, force_reject: bool = Query(default=False)) -> Ver
     try:
         nim_called = NIM_ENABLED and not combined_force_reject
 
-        if nim_called:
+        if combined_force_reject:
+            # Fixed template that already matches the schema: no stub, no validation.
+            response_json = build_reject_response(req.proposed_intent)
+            schema_valid, schema_error = True, None
+        elif nim_called:
             response_json = call_cosmos_nim(
                 proposed_intent=req.proposed_intent,
                 frames=req.frames,
@@ -97,15 +219,15 @@ def verify(req: VerifyRequest, force_reject: bool = Query(default=False)) -> Ver
                 local_confidence=req.local_confidence,
                 force_reject=False,
             )
+            schema_valid, schema_error = validate_response(response_json)
         else:
             response_json = build_stub_response(
                 event_id=req.event_id,
                 proposed_intent=req.proposed_intent,
-                force_reject=combined_force_reject,
             )
+            schema_valid, schema_error = validate_response(response_json)
 
-        schema_valid, schema_error = validate_response(response_json)
-        latency_ms = round((time.perf_counter() - started) * 1000, 3)
+        latency_ms = (time.perf_counter_ns() - started_ns) / 1e6
         log_record = {
             "event_id": req.event_id,
             "ts_request_received_unix": ts_request_received_unix,
@@ -119,19 +241,20 @@ def verify(req: VerifyRequest, force_reject: bool = Query(default=False)) -> Ver
             **({"student_prediction": req.student_prediction} if req.student_prediction else {}),
             **({"error": schema_error} if schema_error else {}),
         }
-        append_jsonl(VERIFIER_LOG_PATH, log_record)
+        app.state.event_log.put(log_record)
         log_written = True
 
         if not schema_valid:
             raise HTTPException(status_code=500, detail=f"Schema validation failed: {schema_error}")
 
+        if combined_force_reject:
+            return VerifyResponse.model_construct(**response_json)
         return VerifyResponse(**response_json)
 
     except HTTPException as exc:
         if not log_written:
-            latency_ms = round((time.perf_counter() - started) * 1000, 3)
-            append_jsonl(
-                VERIFIER_LOG_PATH,
+            latency_ms = (time.perf_counter_ns() - started_ns) / 1e6
+            app.state.event_log.put(
                 {
                     "event_id": req.event_id,
                     "ts_request_received_unix": ts_request_received_unix,
@@ -146,9 +269,8 @@ def verify(req: VerifyRequest, force_reject: bool = Query(default=False)) -> Ver
             )
         raise
     except Exception as exc:
-        latency_ms = round((time.perf_counter() - started) * 1000, 3)
-        append_jsonl(
-            VERIFIER_LOG_PATH,
+        latency_ms = (time.perf_counter_ns() - started_ns) / 1e6
+        app.state.event_log.put(
             {
                 "event_id": req.event_id,
                 "ts_request_received_unix": ts_request_received_unix,
@@ -162,3 +284,22 @@ def verify(req: VerifyRequest, force_reject: bool = Query(default=False)) -> Ver
             }
         )
         raise HTTPException(status_code=500, detail=str(exc)) from exc
+
+
+@app.post("/verify_batch", response_model=VerifyBatchResponse)
+def verify_batch(batch: VerifyBatchRequest, force_reject: bool = Query(default=False)) -> VerifyBatchResponse:
+    """Verify several clips in one call; responses are returned in request order.
+
+    A clip that fails gets an {"event_id", "error"} entry instead of failing the batch.
+    """
+
+    def verify_one(req: VerifyRequest) -> VerifyResponse | VerifyBatchError:
+        try:
+            return verify(req, force_reject=force_reject)
+        except HTTPException as exc:
+            return VerifyBatchError(event_id=req.event_id, error=str(exc.detail))
+
+    workers = max(1, min(len(batch.clips), VERIFY_BATCH_WORKERS))
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        responses = list(pool.map(verify_one, batch.clips))
+    return VerifyBatchResponse(responses=responses)
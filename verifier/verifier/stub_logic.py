@@ -2,20 +2,28 @@ from typing import Literal
 
 Intent = Literal["OPEN_MENU", "CLOSE_MENU", "SWITCH_RIGHT", "SWITCH_LEFT"]
 
+# Forced rejections are fully determined by the proposed intent, so the response
+# is built once here and main.verify() skips schema validation for it.
+_FORCE_REJECT_RESPONSE = {
+    "version": "1.0",
+    "proposed_intent": None,
+    "final_intent": "NONE",
+    "intentional": False,
+    "confidence": 0.9,
+    "reason_category": "accidental_motion",
+    "rationale": "Forced reject is enabled for test validation.",
+}
+
+
+def build_reject_response(proposed_intent: Intent) -> dict:
+    return {**_FORCE_REJECT_RESPONSE, "proposed_intent": proposed_intent}
+
 
 def build_stub_response(event_id: str, proposed_intent: Intent, force_reject: bool = False) -> dict:
     _ = event_id
 
     if force_reject:
-        return {
-            "version": "1.0",
-            "proposed_intent": proposed_intent,
-            "final_intent": "NONE",
-            "intentional": False,
-            "confidence": 0.9,
-            "reason_category": "accidental_motion",
-            "rationale": "Forced reject is enabled for test validation.",
-        }
+        return build_reject_response(proposed_intent)
 
     return {
         "version": "1.0",